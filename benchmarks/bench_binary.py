@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Сравнение размера файла и времени выполнения команд list/select для
+# файлов маршрутов в формате JSON и в двоичном формате.
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from bench_load import write_routes  # noqa: E402
+
+from ind_1 import Routes  # noqa: E402
+
+
+def timed(action: Callable[[], object]) -> float:
+    started = time.perf_counter()
+    action()
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--count", type=int, default=500_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "routes.json"
+        binary_path = Path(tmp) / "routes.bin"
+        write_routes(json_path, args.count)
+        Routes.open(json_path).save(binary_path)
+
+        for file_path in (json_path, binary_path):
+            size_mb = file_path.stat().st_size / 2**20
+            list_time = timed(lambda: sum(1 for _ in Routes.open(file_path).routes))
+            select_time = timed(lambda: Routes.open(file_path).select("point-7"))
+            print(
+                f"{file_path.suffix:>6}: {size_mb:7.1f} МиБ, "
+                f"list {list_time:6.2f} с, select {select_time:6.2f} с"
+            )
+
+
+if __name__ == "__main__":
+    main()
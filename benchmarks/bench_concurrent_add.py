@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Пропускная способность одновременного добавления маршрутов в один файл
+# несколькими процессами: с блокировкой на весь цикл загрузки, изменения
+# и сохранения и в оптимистичном режиме, с журналом и без него.
+
+import argparse
+import logging
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from ind_1 import Route, Routes, add_route  # noqa: E402
+
+
+def add_routes(
+    file_path: Path, worker: int, count: int, journal: bool, optimistic: bool
+) -> None:
+    logging.basicConfig(filename=file_path.with_suffix(".log"), level=logging.INFO)
+    for number in range(count):
+        add_route(
+            file_path,
+            f"w{worker}",
+            "x",
+            number,
+            journal=journal,
+            optimistic=optimistic,
+        )
+
+
+def measure(
+    directory: Path, args: argparse.Namespace, journal: bool, optimistic: bool
+) -> tuple[float, int, int]:
+    """
+    Добавить маршруты из нескольких процессов и вернуть время, число
+    потерянных маршрутов и число конфликтов оптимистичного режима.
+    """
+    directory.mkdir()
+    file_path = directory / "routes.json"
+    initial = [Route(f"p{idx}", f"p{idx + 1}", -idx) for idx in range(args.size)]
+    Routes(sorted(initial, key=lambda item: item.number)).save(file_path)
+
+    context = multiprocessing.get_context("fork")
+    processes = [
+        context.Process(
+            target=add_routes,
+            args=(file_path, worker, args.count, journal, optimistic),
+        )
+        for worker in range(args.writers)
+    ]
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    lost = args.size + args.writers * args.count - len(Routes.open(file_path))
+    log = file_path.with_suffix(".log").read_text(encoding="utf-8")
+    return elapsed, lost, log.count("изменен другим процессом")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-w", "--writers", type=int, default=8)
+    parser.add_argument("-n", "--count", type=int, default=20)
+    parser.add_argument("-s", "--size", type=int, default=2000)
+    args = parser.parse_args()
+
+    total = args.writers * args.count
+    print(
+        f"Процессов: {args.writers}, маршрутов на процесс: {args.count}, "
+        f"маршрутов в файле: {args.size}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode, (title, journal, optimistic) in enumerate(
+            [
+                ("блокировка", False, False),
+                ("блокировка, журнал", True, False),
+                ("оптимистично", False, True),
+                ("оптимистично, журнал", True, True),
+            ]
+        ):
+            directory = Path(tmp) / str(mode)
+            elapsed, lost, conflicts = measure(directory, args, journal, optimistic)
+            print(
+                f"{title:>22}: {total / elapsed:8.1f} маршрутов/с, "
+                f"потеряно {lost}, конфликтов {conflicts}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Построение графа маршрутов на синтетической сети, время поиска путей
+# с наименьшим числом пересадок и пополнения графа новыми маршрутами.
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from ind_1 import Route, Routes  # noqa: E402
+from route_graph import count_transfers  # noqa: E402
+
+
+def network(edges: int, points: int, stops: int, seed: int) -> list[Route]:
+    """
+    Получить сеть из маршрутов, каждый из которых последовательно
+    проходит stops случайных пунктов.
+    """
+    rng = random.Random(seed)
+    routes: list[Route] = []
+    number = 0
+    while len(routes) < edges:
+        number += 1
+        line = [f"p{rng.randrange(points)}" for _ in range(stops + 1)]
+        for start, end in zip(line, line[1:]):
+            routes.append(Route(start, end, number))
+    return routes[:edges]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--edges", type=int, default=1_000_000)
+    parser.add_argument("-p", "--points", type=int, default=100_000)
+    parser.add_argument("-s", "--stops", type=int, default=20)
+    parser.add_argument("-q", "--queries", type=int, default=10)
+    args = parser.parse_args()
+
+    routes = Routes(network(args.edges, args.points, args.stops, seed=1))
+    started = time.perf_counter()
+    graph = routes.graph()
+    print(f"Граф: {len(graph)} ребер, {len(graph.edges)} пунктов отправления")
+    print(f"Построение: {time.perf_counter() - started:8.2f} с")
+
+    rng = random.Random(2)
+    started = time.perf_counter()
+    found = transfers = 0
+    for _ in range(args.queries):
+        start, end = f"p{rng.randrange(args.points)}", f"p{rng.randrange(args.points)}"
+        legs = graph.path(start, end)
+        if legs is not None:
+            found += 1
+            transfers += count_transfers(legs)
+    elapsed = time.perf_counter() - started
+    print(
+        f"Поиск пути: {elapsed / args.queries * 1000:8.1f} мс на запрос, "
+        f"найдено {found} из {args.queries}, "
+        f"в среднем {transfers / max(found, 1):.1f} пересадок"
+    )
+
+    started = time.perf_counter()
+    reachable = graph.reachable("p0")
+    elapsed = time.perf_counter() - started
+    print(f"Достижимость: {elapsed * 1000:8.1f} мс, {len(reachable)} пунктов")
+
+    number = max(route.number for route in routes.routes) + 1
+    started = time.perf_counter()
+    added = routes.add_many(
+        (f"p{rng.randrange(args.points)}", f"p{rng.randrange(args.points)}", number)
+        for _ in range(10_000)
+    )
+    elapsed = time.perf_counter() - started
+    print(f"Добавление {added} маршрутов с обновлением графа: {elapsed:8.2f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Сравнение вывода списка маршрутов одной строкой (print) и построчно
+# (Routes.write) по времени и пику памяти, а также время вывода одной
+# страницы из файла двоичного формата.
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, TextIO
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from bench_load import write_routes  # noqa: E402
+
+from ind_1 import RouteFile, Routes  # noqa: E402
+
+
+def write_str(routes: Routes, file: TextIO, fmt: str) -> None:
+    print(routes, file=file)
+
+
+def write_stream(routes: Routes, file: TextIO, fmt: str) -> None:
+    routes.write(file, fmt)
+
+
+def measure(action: Callable[[], None]) -> tuple[float, float]:
+    """
+    Выполнить действие и вернуть время в секундах и пик памяти в МиБ.
+    """
+    started = time.perf_counter()
+    action()
+    elapsed = time.perf_counter() - started
+    # Память измеряется отдельным запуском: tracemalloc сильно замедляет код.
+    tracemalloc.start()
+    action()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--count", type=int, default=500_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "routes.json"
+        binary_path = Path(tmp) / "routes.bin"
+        write_routes(json_path, args.count)
+        Routes.open(json_path).save(binary_path)
+
+        print(f"Маршрутов: {args.count}")
+        with RouteFile(binary_path) as route_file:
+            routes = Routes(route_file)
+            for title, write, fmt in [
+                ("print", write_str, "table"),
+                ("table", write_stream, "table"),
+                ("jsonl", write_stream, "jsonl"),
+                ("csv", write_stream, "csv"),
+            ]:
+
+                def run() -> None:
+                    with open(os.devnull, "w", encoding="utf-8") as file:
+                        write(routes, file, fmt)
+
+                elapsed, peak = measure(run)
+                print(f"{title:>6}: {elapsed:6.2f} с, пик памяти {peak:8.1f} МиБ")
+
+        offset = args.count - 100
+
+        def page() -> None:
+            with (
+                open(os.devnull, "w", encoding="utf-8") as file,
+                RouteFile(binary_path) as route_file,
+            ):
+                Routes(route_file).page(offset, 50).write(file, "table", offset + 1)
+
+        elapsed, peak = measure(page)
+        print(
+            f"Страница из 50 маршрутов со смещением {offset}: "
+            f"{elapsed * 1000:6.2f} мс, пик памяти {peak:8.1f} МиБ"
+        )
+
+
+if __name__ == "__main__":
+    main()
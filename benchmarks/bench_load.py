@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Сравнение времени и пикового потребления памяти (RSS) при загрузке
+# маршрутов из файла JSON целиком и в потоковом режиме.
+
+import argparse
+import json
+import multiprocessing as mp
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from ind_1 import CHUNK_SIZE, Routes  # noqa: E402
+
+
+def write_routes(file_path: Path, count: int) -> None:
+    """
+    Записать синтетический файл маршрутов в формате Routes.save.
+    """
+    with file_path.open("w", encoding="utf-8") as file_out:
+        file_out.write("[\n")
+        for number in range(count):
+            record = {
+                "__type__": "Route",
+                "start": f"point-{number % 1000}",
+                "end": f"point-{(number * 7) % 1000}",
+                "number": number,
+            }
+            if number:
+                file_out.write(",\n")
+            file_out.write(json.dumps(record, indent=4))
+        file_out.write("\n]")
+
+
+def measure(file_path: Path, chunk_size: int | None) -> tuple[float, int]:
+    """
+    Загрузить маршруты и вернуть время загрузки и пиковый RSS в КиБ.
+    """
+    started = time.perf_counter()
+    routes = Routes()
+    routes.load(file_path, chunk_size)
+    elapsed = time.perf_counter() - started
+    return elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_isolated(file_path: Path, chunk_size: int | None) -> tuple[float, int]:
+    """
+    Выполнить замер в отдельном процессе, чтобы пиковый RSS не смешивался.
+    """
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        return pool.apply(measure, (file_path, chunk_size))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--count", type=int, default=500_000)
+    parser.add_argument("-c", "--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = Path(tmp) / "routes.json"
+        write_routes(file_path, args.count)
+        size_mb = file_path.stat().st_size / 2**20
+        print(f"Файл: {args.count} маршрутов, {size_mb:.1f} МиБ")
+
+        for title, chunk_size in (("json.load", None), ("stream", args.chunk_size)):
+            elapsed, rss = run_isolated(file_path, chunk_size)
+            print(f"{title:>10}: {elapsed:8.2f} с, пиковый RSS {rss / 1024:8.1f} МиБ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Время генерации матрицы в зависимости от числа процессов.
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from task_2 import ENGINES, Matrix  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-r", "--rows", type=int, default=200_000)
+    parser.add_argument("-c", "--columns", type=int, default=100)
+    parser.add_argument("-e", "--engine", choices=ENGINES, default="python")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    cells = args.rows * args.columns
+    print(f"Матрица {args.rows} x {args.columns}, способ {args.engine}")
+    reference = None
+    for workers in sorted({1, 2, args.workers}):
+        matrix = Matrix(args.rows, args.columns, 0, 1000, engine=args.engine, seed=1)
+        started = time.perf_counter()
+        matrix.generate_matrix(workers=workers)
+        elapsed = time.perf_counter() - started
+        if reference is None:
+            reference = matrix.matrix
+        same = "совпадает" if matrix.matrix == reference else "ОТЛИЧАЕТСЯ"
+        print(
+            f"процессов {workers:>3}: {elapsed:6.2f} с, "
+            f"{cells / elapsed / 1e6:6.2f} млн/с, результат {same}"
+        )
+
+
+if __name__ == "__main__":
+    main()
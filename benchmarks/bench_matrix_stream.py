@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Сравнение пиковой памяти и скорости вывода матрицы в файл: построение
+# всей строки через str после generate_matrix и потоковая запись write.
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, TextIO
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from task_2 import ENGINES, Matrix  # noqa: E402
+
+
+def write_str(matrix: Matrix, file: TextIO) -> None:
+    matrix.generate_matrix()
+    file.write(str(matrix))
+
+
+def write_stream(matrix: Matrix, file: TextIO) -> None:
+    matrix.write(file)
+
+
+def measure(
+    write: Callable[[Matrix, TextIO], None], args: argparse.Namespace, path: Path
+) -> tuple[float, float]:
+    """
+    Записать матрицу в файл и вернуть время в секундах и пик памяти в МиБ.
+    """
+
+    def run() -> None:
+        matrix = Matrix(args.rows, args.columns, 0, 1000, engine=args.engine, seed=1)
+        with path.open("w", encoding="utf-8") as file:
+            write(matrix, file)
+
+    started = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - started
+    # Память измеряется отдельным запуском: tracemalloc сильно замедляет код.
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-r", "--rows", type=int, default=100_000)
+    parser.add_argument("-c", "--columns", type=int, default=100)
+    parser.add_argument("-e", "--engine", choices=ENGINES, default="python")
+    parser.add_argument("-o", "--output", type=Path, default=Path("matrix.txt"))
+    args = parser.parse_args()
+
+    cells = args.rows * args.columns
+    print(f"Матрица {args.rows} x {args.columns}, способ {args.engine}")
+    for title, write in [("str", write_str), ("write", write_stream)]:
+        elapsed, peak = measure(write, args, args.output)
+        print(
+            f"{title:>6}: {elapsed:6.2f} с, {cells / elapsed / 1e6:6.2f} млн/с, "
+            f"пик памяти {peak:8.1f} МиБ"
+        )
+    args.output.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Сравнение объема памяти, занимаемой коллекциями маршрутов и работников
+# при хранении списком объектов и в столбцовом хранилище.
+
+import argparse
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from ind_1 import Route, RouteColumns  # noqa: E402
+from prim import Worker, WorkerColumns  # noqa: E402
+
+
+@dataclass(frozen=True)
+class PlainRoute:
+    start: str
+    end: str
+    number: int
+
+
+def routes(count: int, record_type: Callable[..., Any] = Route) -> Iterator[Any]:
+    # Строки создаются заново для каждой записи, как при разборе JSON.
+    for number in range(count):
+        yield record_type(f"point-{number % 1000}", f"point-{number % 997}", number)
+
+
+def workers(count: int) -> Iterator[Worker]:
+    for number in range(count):
+        yield Worker(f"Сотрудник {number % 5000}", f"должность {number % 50}", 2000)
+
+
+def measure(build: Callable[[], object]) -> float:
+    """
+    Построить коллекцию и вернуть занятую ею память в МиБ.
+    """
+    tracemalloc.start()
+    collection = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del collection
+    return current / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+    count = args.count
+
+    cases: list[tuple[str, Callable[[], object]]] = [
+        ("list[Route] без slots", lambda: list(routes(count, PlainRoute))),
+        ("list[Route]", lambda: list(routes(count))),
+        ("RouteColumns", lambda: RouteColumns(routes(count))),
+        ("list[Worker]", lambda: list(workers(count))),
+        ("WorkerColumns", lambda: WorkerColumns(workers(count))),
+    ]
+    print(f"Записей: {count}")
+    for title, build in cases:
+        size = measure(build)
+        print(f"{title:>22}: {size:8.1f} МиБ, {size * 2**20 / count:6.1f} байт/запись")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Построение индекса названий пунктов и время поиска по префиксу и
+# нечеткого поиска на синтетическом наборе различных названий.
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from point_index import PointIndex  # noqa: E402
+
+ALPHABET = "абвгдежзийклмнопрстуфхцчшщыэюя"
+
+
+def misspell(rng: random.Random, name: str, edits: int) -> str:
+    """
+    Внести в название заданное число случайных правок.
+    """
+    for _ in range(edits):
+        pos = rng.randrange(len(name))
+        head, tail, char = name[:pos], name[pos:], rng.choice(ALPHABET)
+        match rng.randrange(3):
+            case 0:
+                name = head + tail[1:]
+            case 1:
+                name = head + char + tail[1:]
+            case _:
+                name = head + char + tail
+    return name
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-p", "--points", type=int, default=100_000)
+    parser.add_argument("-q", "--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    names: set[str] = set()
+    while len(names) < args.points:
+        size = rng.randint(5, 16)
+        names.add("".join(rng.choice(ALPHABET) for _ in range(size)))
+
+    started = time.perf_counter()
+    index = PointIndex(names)
+    print(f"Индекс: {len(index)} пунктов")
+    print(f"Построение: {time.perf_counter() - started:8.2f} с")
+
+    samples = rng.sample(sorted(names), args.queries)
+    started = time.perf_counter()
+    found = sum(len(index.prefix(name[:3])) for name in samples)
+    elapsed = time.perf_counter() - started
+    print(
+        f"Префикс:    {elapsed / args.queries * 1000:8.3f} мс на запрос, "
+        f"в среднем {found / args.queries:.1f} пунктов"
+    )
+
+    for distance in (1, 2):
+        queries = [misspell(rng, name, distance) for name in samples]
+        started = time.perf_counter()
+        found = sum(len(index.fuzzy(query, distance)) for query in queries)
+        elapsed = time.perf_counter() - started
+        print(
+            f"Нечеткий, {distance} правки: "
+            f"{elapsed / args.queries * 1000:8.3f} мс на запрос, "
+            f"в среднем {found / args.queries:.1f} пунктов"
+        )
+
+
+if __name__ == "__main__":
+    main()
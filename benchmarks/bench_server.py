@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Сравнение задержки одной команды routes при запуске нового
+# интерпретатора, через параметр --socket, через отдельный клиент
+# routes_client и при прямом запросе к серверу через сокет.
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+from bench_load import write_routes  # noqa: E402
+
+from routes_client import send_command  # noqa: E402
+
+
+def latency(action: Callable[[], object], repeat: int) -> float:
+    """
+    Получить среднее время выполнения действия в миллисекундах.
+    """
+    started = time.perf_counter()
+    for _ in range(repeat):
+        action()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--count", type=int, default=10_000)
+    parser.add_argument("-r", "--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / "json").mkdir()
+        write_routes(Path(tmp) / "json" / "routes.json", args.count)
+        socket_path = Path(tmp) / "routes.sock"
+        script = str(SRC / "ind_1.py")
+        client = str(SRC / "routes_client.py")
+        command = ["select", "-p", "point-7", "routes.json"]
+
+        server = subprocess.Popen(
+            [sys.executable, script, "--socket", str(socket_path), "serve"], cwd=tmp
+        )
+        try:
+            while not socket_path.exists():
+                time.sleep(0.01)
+
+            def run(argv: list[str], program: str = script) -> None:
+                subprocess.run(
+                    [sys.executable, program, *argv],
+                    cwd=tmp,
+                    check=True,
+                    stdout=subprocess.DEVNULL,
+                )
+
+            def request() -> None:
+                send_command(socket_path, command)
+
+            request()
+            cases: list[tuple[str, Callable[[], object]]] = [
+                ("CLI", lambda: run(command)),
+                ("клиент", lambda: run(["--socket", str(socket_path), *command])),
+                (
+                    "routes_client",
+                    lambda: run(["--socket", str(socket_path), *command], client),
+                ),
+                ("сокет", request),
+            ]
+            print(f"Маршрутов: {args.count}, повторов: {args.repeat}")
+            for title, action in cases:
+                print(f"{title:>13}: {latency(action, args.repeat):8.2f} мс/команда")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
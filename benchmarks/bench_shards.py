@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Загрузка набора маршрутов, разделенного на несколько файлов: k-путевое
+# слияние по номеру при последовательной и параллельной загрузке.
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from ind_1 import Route, Routes  # noqa: E402
+
+
+def write_shards(directory: Path, count: int, shards: int, suffix: str) -> list[Path]:
+    """
+    Записать count маршрутов в shards файлов: маршрут с номером n
+    попадает в файл n % shards, поэтому номера файлов перемежаются.
+    """
+    paths = []
+    for shard in range(shards):
+        routes = Routes(
+            [
+                Route(f"point-{number % 1000}", f"point-{number * 7 % 1000}", number)
+                for number in range(shard, count, shards)
+            ]
+        )
+        path = directory / f"region-{shard}{suffix}"
+        routes.save(path)
+        paths.append(path)
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--count", type=int, default=1_000_000)
+    parser.add_argument("-s", "--shards", type=int, default=24)
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    print(f"Маршрутов: {args.count}, файлов: {args.shards}, CPU: {os.cpu_count()}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for suffix in (".json", ".bin"):
+            paths = write_shards(Path(tmp), args.count, args.shards, suffix)
+            for workers in sorted({1, args.workers}):
+                started = time.perf_counter()
+                routes = Routes.open_many(paths, workers=workers)
+                elapsed = time.perf_counter() - started
+                assert len(routes) == args.count
+                print(f"{suffix:>6}, процессов {workers:2}: {elapsed:6.2f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Пропускная способность добавления работников из сценария: пакетный
+# режим run_batch с асинхронным журналом и поочередное выполнение
+# команд add, как в интерактивном режиме, с синхронным журналом.
+
+import argparse
+import contextlib
+import io
+import multiprocessing as mp
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from logconf import configure_logging  # noqa: E402
+from prim import Staff, execute, run_batch  # noqa: E402
+
+
+def script(count: int) -> list[str]:
+    """
+    Получить строки сценария, добавляющего count работников.
+    """
+    lines = []
+    for number in range(count):
+        lines += ["add", f"Сотрудник {number * 7919 % count}", "инженер", "2000"]
+    return lines + ["select 20"]
+
+
+def measure(batch: bool, count: int, log_path: Path) -> float:
+    """
+    Выполнить сценарий и вернуть время выполнения в секундах.
+    """
+    configure_logging(str(log_path), use_queue=batch)
+    lines = script(count)
+    staff = Staff()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if batch:
+            run_batch(staff, lines)
+        else:
+            values = iter(lines)
+            for command in values:
+                execute(staff, command, lambda _: next(values))
+    return time.perf_counter() - started
+
+
+def run_isolated(batch: bool, count: int, log_path: Path) -> float:
+    """
+    Выполнить замер в отдельном процессе с собственной настройкой журнала.
+    """
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        return pool.apply(measure, (batch, count, log_path))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--count", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"Сценарий: {args.count} работников")
+    with tempfile.TemporaryDirectory() as tmp:
+        for title, batch in (("по одному", False), ("пакетом", True)):
+            elapsed = run_isolated(batch, args.count, Path(tmp) / "workers.log")
+            print(f"{title:>10}: {elapsed:6.2f} с, {args.count / elapsed:10.0f} зап./с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Сравнение времени и пикового потребления памяти (RSS) при загрузке
+# работников из файла XML: построение всего дерева через ET.fromstring,
+# как в прежней версии Staff.load, и потоковый разбор.
+
+import argparse
+import multiprocessing as mp
+import resource
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from prim import Staff, Worker  # noqa: E402
+
+
+def write_workers(file_path: Path, count: int) -> None:
+    """
+    Записать синтетический файл работников в формате Staff.save.
+    """
+    with file_path.open("w", encoding="utf8") as file_out:
+        file_out.write("<?xml version='1.0' encoding='utf8'?>\n<workers>")
+        for number in range(count):
+            file_out.write(
+                f"<worker><name>Сотрудник {number}</name>"
+                f"<post>должность {number % 50}</post>"
+                f"<year>{1990 + number % 30}</year></worker>"
+            )
+        file_out.write("</workers>")
+
+
+def load_tree(filename: str) -> Staff:
+    """
+    Загрузить работников, построив дерево документа целиком.
+    """
+    with open(filename, "r", encoding="utf8") as fin:
+        xml = fin.read()
+
+    staff = Staff()
+    tree = ET.fromstring(xml, parser=ET.XMLParser(encoding="utf8"))
+    for worker_element in tree:
+        fields = {element.tag: element.text for element in worker_element}
+        staff.workers.append(
+            Worker(fields["name"] or "", fields["post"] or "", int(fields["year"] or 0))
+        )
+    return staff
+
+
+def load_stream(filename: str) -> Staff:
+    staff = Staff()
+    staff.load(filename)
+    return staff
+
+
+def measure(stream: bool, file_path: Path) -> tuple[float, int, int]:
+    """
+    Загрузить работников и вернуть время загрузки, их число и пиковый
+    RSS в КиБ.
+    """
+    started = time.perf_counter()
+    staff = (load_stream if stream else load_tree)(str(file_path))
+    elapsed = time.perf_counter() - started
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return elapsed, len(staff.workers), rss
+
+
+def run_isolated(stream: bool, file_path: Path) -> tuple[float, int, int]:
+    """
+    Выполнить замер в отдельном процессе, чтобы пиковый RSS не смешивался.
+    """
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        return pool.apply(measure, (stream, file_path))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--count", type=int, default=500_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = Path(tmp) / "workers.xml"
+        write_workers(file_path, args.count)
+        size_mb = file_path.stat().st_size / 2**20
+        print(f"Файл: {args.count} работников, {size_mb:.1f} МиБ")
+
+        for title, stream in (("fromstring", False), ("stream", True)):
+            elapsed, count, rss = run_isolated(stream, file_path)
+            print(
+                f"{title:>10}: {elapsed:8.2f} с, {count} работников, "
+                f"пиковый RSS {rss / 1024:8.1f} МиБ"
+            )
+
+
+if __name__ == "__main__":
+    main()
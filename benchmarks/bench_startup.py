@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Замер времени импорта модулей (python -X importtime) и полного времени
+# выполнения для каждой команды программы маршрутов с проверкой бюджета.
+# Завершается с кодом 1, если время импорта хотя бы одной команды
+# превышает бюджет.
+
+import argparse
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPT = ROOT / "src" / "ind_1.py"
+
+# Бюджет времени импорта для каждой команды, мс.
+BUDGETS: dict[str, tuple[list[str], float]] = {
+    "--version": (["--version"], 100.0),
+    "list": (["list", "fi.json"], 100.0),
+    "select": (["select", "-p", "stav", "fi.json"], 100.0),
+    "add": (["add", "-s", "a", "-e", "b", "-n", "1", "fi.json"], 100.0),
+    "convert": (["convert", "fi.json", "-o", "fi.bin"], 100.0),
+}
+
+IMPORT_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def import_time(stderr: str) -> tuple[float, list[tuple[float, str]]]:
+    """
+    Получить суммарное время импорта в мс и самые долгие модули верхнего
+    уровня из вывода -X importtime.
+    """
+    top: list[tuple[float, str]] = []
+    for match in IMPORT_LINE.finditer(stderr):
+        cumulative, indent, name = match.groups()
+        if not indent:
+            top.append((int(cumulative) / 1000, name))
+    top.sort(reverse=True)
+    return sum(ms for ms, _ in top), top[:3]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="Multiply all budgets by this factor"
+    )
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / "json").mkdir()
+        for title, (argv, budget) in BUDGETS.items():
+            budget *= args.scale
+            best_import, best_wall = float("inf"), float("inf")
+            slowest: list[tuple[float, str]] = []
+            for _ in range(args.repeat):
+                shutil.copy(ROOT / "json" / "fi.json", Path(tmp) / "json" / "fi.json")
+                started = time.perf_counter()
+                result = subprocess.run(
+                    [sys.executable, "-X", "importtime", str(SCRIPT), *argv],
+                    cwd=tmp,
+                    capture_output=True,
+                    text=True,
+                )
+                wall = (time.perf_counter() - started) * 1000
+                total, top = import_time(result.stderr)
+                if total < best_import:
+                    best_import, slowest = total, top
+                best_wall = min(best_wall, wall)
+
+            status = "ok" if best_import <= budget else "ПРЕВЫШЕН"
+            failed = failed or best_import > budget
+            modules = ", ".join(f"{name} {ms:.1f}" for ms, name in slowest)
+            print(
+                f"{title:>10}: импорт {best_import:6.1f} мс (бюджет {budget:.0f}, "
+                f"{status}), всего {best_wall:6.1f} мс; {modules}"
+            )
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Компактное столбцовое хранилище для коллекций однотипных записей:
+# числовые поля хранятся в массивах array, строковые поля - в виде
+# номеров строк в общей таблице интернированных строк.
+
+from array import array
+from typing import (
+    Any,
+    Callable,
+    Generic,
+    Iterable,
+    Iterator,
+    MutableSequence,
+    Sequence,
+    TypeVar,
+    overload,
+)
+
+T = TypeVar("T")
+
+# Код типа столбца со строковыми значениями.
+STR = "str"
+
+
+class StringTable:
+    """
+    Таблица интернированных строк: каждая строка хранится один раз.
+    """
+
+    def __init__(self) -> None:
+        self.strings: list[str] = []
+        self.ids: dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        """
+        Получить номер строки, добавив её в таблицу при необходимости.
+        """
+        idx = self.ids.get(value)
+        if idx is None:
+            idx = len(self.strings)
+            self.strings.append(value)
+            self.ids[value] = idx
+        return idx
+
+    def __getitem__(self, idx: int) -> str:
+        return self.strings[idx]
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+
+class Columns(MutableSequence[T], Generic[T]):
+    """
+    Последовательность записей, хранящая каждое поле в отдельном столбце.
+    Записи создаются заново при каждом обращении к элементу.
+    """
+
+    def __init__(
+        self,
+        record_type: Callable[..., T],
+        fields: Sequence[tuple[str, str]],
+        items: Iterable[T] = (),
+    ) -> None:
+        self.record_type = record_type
+        self.names = [name for name, _ in fields]
+        self.is_str = [code == STR for _, code in fields]
+        self.table = StringTable()
+        self.columns = [array("i" if code == STR else code) for _, code in fields]
+        self.extend(items)
+
+    def _encode(self, item: T) -> list[Any]:
+        return [
+            self.table.intern(getattr(item, name)) if is_str else getattr(item, name)
+            for name, is_str in zip(self.names, self.is_str)
+        ]
+
+    def _decode(self, idx: int) -> T:
+        strings = self.table.strings
+        return self.record_type(
+            *(
+                strings[column[idx]] if is_str else column[idx]
+                for column, is_str in zip(self.columns, self.is_str)
+            )
+        )
+
+    def _reset(self, items: Iterable[T]) -> None:
+        columns = [array(column.typecode) for column in self.columns]
+        table = StringTable()
+        self.columns, self.table = columns, table
+        self.extend(items)
+
+    def __len__(self) -> int:
+        return len(self.columns[0])
+
+    @overload
+    def __getitem__(self, index: int) -> T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[T]: ...
+
+    def __getitem__(self, index: int | slice) -> T | list[T]:
+        if isinstance(index, slice):
+            return [self._decode(idx) for idx in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("index out of range")
+        return self._decode(index)
+
+    @overload
+    def __setitem__(self, index: int, value: T) -> None: ...
+
+    @overload
+    def __setitem__(self, index: slice, value: Iterable[T]) -> None: ...
+
+    def __setitem__(self, index: int | slice, value: Any) -> None:
+        if isinstance(index, slice):
+            items = list(self)
+            items[index] = value
+            self._reset(items)
+            return
+        for column, encoded in zip(self.columns, self._encode(value)):
+            column[index] = encoded
+
+    def __delitem__(self, index: int | slice) -> None:
+        for column in self.columns:
+            del column[index]
+
+    def __iter__(self) -> Iterator[T]:
+        for idx in range(len(self)):
+            yield self._decode(idx)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)!r})"
+
+    def insert(self, index: int, value: T) -> None:
+        for column, encoded in zip(self.columns, self._encode(value)):
+            column.insert(index, encoded)
+
+    def append(self, value: T) -> None:
+        for column, encoded in zip(self.columns, self._encode(value)):
+            column.append(encoded)
+
+    def extend(self, values: Iterable[T]) -> None:
+        if values is self:
+            values = list(values)
+        for value in values:
+            self.append(value)
+
+    def clear(self) -> None:
+        self._reset(())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Вспомогательные функции для работы с файлами данных, общие для
+# программ.
+
+import contextlib
+import fcntl
+import os
+from pathlib import Path
+from typing import IO, Any, Iterator
+
+
+@contextlib.contextmanager
+def atomic_write(file_path: Path, mode: str = "w", **kwargs: Any) -> Iterator[IO[Any]]:
+    """
+    Открыть временный файл для записи и после успешной записи атомарно
+    заменить им файл с заданным именем.
+    """
+    tmp_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.tmp")
+    try:
+        with tmp_path.open(mode, **kwargs) as file_out:
+            yield file_out
+            file_out.flush()
+            os.fsync(file_out.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+@contextlib.contextmanager
+def file_lock(lock_path: Path, shared: bool = False) -> Iterator[None]:
+    """
+    Захватить рекомендательную блокировку файла lock_path, создав его при
+    необходимости, и ждать ее освобождения другими процессами. Блокировка
+    берется на отдельный файл: файл данных при сохранении заменяется
+    новым, и блокировка его старой версии ничего бы не защищала.
+    """
+    with lock_path.open("a") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+# Ширина счетчика изменений в файле: число всегда записывается целиком
+# на место предыдущего, и файл не нужно обрезать.
+COUNTER_WIDTH = 20
+
+
+def read_counter(counter_path: Path) -> int:
+    """
+    Прочитать счетчик изменений из файла; 0, если файла нет или счетчик
+    в него еще не записан.
+    """
+    try:
+        with counter_path.open("rb") as counter_file:
+            data = counter_file.read(COUNTER_WIDTH)
+    except FileNotFoundError:
+        return 0
+    return int(data) if data.isdigit() else 0
+
+
+def increment_counter(counter_path: Path) -> int:
+    """
+    Увеличить счетчик изменений в файле и вернуть новое значение. Файл
+    изменяется на месте, а не заменяется, поэтому счетчик можно хранить
+    в файле блокировки; вызывать под исключительной блокировкой.
+    """
+    fd = os.open(counter_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        data = os.pread(fd, COUNTER_WIDTH, 0)
+        counter = (int(data) if data.isdigit() else 0) + 1
+        os.pwrite(fd, f"{counter:0{COUNTER_WIDTH}d}".encode(), 0)
+    finally:
+        os.close(fd)
+    return counter
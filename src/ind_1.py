@@ -9,16 +9,105 @@
 
 import argparse
 import bisect
+import csv
+import functools
+import heapq
 import json
 import logging
+import mmap
 import os
+import random
+import struct
 import sys
-import traceback
-from dataclasses import asdict, dataclass, field
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, NoReturn
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Iterable,
+    Iterator,
+    List,
+    MutableSequence,
+    NoReturn,
+    Sequence,
+    TextIO,
+    overload,
+)
 
-from jsonschema import ValidationError, validate
+from columns import STR, Columns
+from fileio import atomic_write, file_lock, increment_counter, read_counter
+from logconf import configure_logging
+from routes_client import send_command, socket_command
+
+# Пакет jsonschema импортируется только при проверке записей, не
+# прошедших быструю проверку: его загрузка занимает большую часть
+# времени запуска программы.
+if TYPE_CHECKING:
+    from jsonschema.protocols import Validator
+
+    from point_index import PointIndex
+    from route_graph import RouteGraph
+
+# Схема одной записи о маршруте в файле JSON.
+ROUTE_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "__type__": {"type": "string", "enum": ["Route"]},
+        "start": {"type": "string"},
+        "end": {"type": "string"},
+        "number": {"type": "integer"},
+    },
+    "required": [
+        "__type__",
+        "start",
+        "end",
+        "number",
+    ],
+}
+
+# Схема файла JSON со списком маршрутов.
+ROUTES_SCHEMA: dict[str, Any] = {"type": "array", "items": ROUTE_SCHEMA}
+
+# Размер блока (в символах), читаемого за раз при потоковой загрузке.
+CHUNK_SIZE = 1 << 16
+
+# Расширение файлов маршрутов в двоичном формате.
+BINARY_SUFFIX = ".bin"
+# Двоичный формат: заголовок (сигнатура, версия, зарезервированное поле,
+# записываемое как 0, число строк, число маршрутов, размер блока строк),
+# смещения строк, блок строк в UTF-8 и записи фиксированной длины (номер
+# пункта отправления, номер пункта прибытия, номер маршрута).
+BINARY_MAGIC = b"RTB1"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct("<4sHHIQQ")
+BINARY_OFFSET = struct.Struct("<Q")
+BINARY_RECORD = struct.Struct("<IIq")
+
+# Расширение журнала добавленных маршрутов (JSON Lines), который ведется
+# рядом с основным файлом.
+JOURNAL_SUFFIX = ".journal"
+# Число записей в журнале, после которого он переносится в основной файл.
+JOURNAL_LIMIT = 1000
+
+# Расширение файла блокировки, которую команда add держит на время
+# загрузки, изменения и сохранения файла данных.
+LOCK_SUFFIX = ".lock"
+# Число попыток добавления маршрута в оптимистичном режиме и начальная
+# пауза (в секундах) перед повторной попыткой, удваиваемая с каждой
+# попыткой.
+OPTIMISTIC_RETRIES = 20
+OPTIMISTIC_BACKOFF = 0.001
+
+# Форматы вывода команд list и select: таблица для чтения человеком,
+# JSON Lines и CSV для обработки другими программами.
+OUTPUT_FORMATS = ("table", "jsonl", "csv")
+# Строки таблицы маршрутов.
+TABLE_LINE = "+-{}-+-{}-+-{}-+-{}-+".format("-" * 4, "-" * 30, "-" * 20, "-" * 16)
+TABLE_HEADER = "| {:^4} | {:^30} | {:^20} | {:^16} |".format(
+    "No", "Начало", "Конец", "Номер маршрута"
+)
+TABLE_ROW = "| {:^4} | {:<30} | {:<20} | {:>16} |"
 
 
 class CustomArgumentParser(argparse.ArgumentParser):
@@ -50,18 +139,616 @@ class FileNotExistsError(Exception):
         return f"{self.file_path} -> {self.message}"
 
 
-@dataclass(frozen=True)
+# Класс пользовательского исключения в случае, если файл в оптимистичном
+# режиме так и не удалось изменить из-за изменений другими процессами.
+class ConcurrentUpdateError(Exception):
+    def __init__(
+        self, file_path: Path, message: str = "File is being changed concurrently"
+    ) -> None:
+        self.file_path = file_path
+        self.message = message
+        super(ConcurrentUpdateError, self).__init__(message)
+
+    def __str__(self) -> str:
+        return f"{self.file_path} -> {self.message}"
+
+
+# Класс пользовательского исключения в случае, если команда, отправленная
+# серверу маршрутов, завершилась ошибкой.
+class ServerError(Exception):
+    def __init__(self, command: list[str], message: str = "Server error") -> None:
+        self.command = command
+        self.message = message
+        super(ServerError, self).__init__(message)
+
+    def __str__(self) -> str:
+        return self.message
+
+
+@functools.cache
+def _compiled_validator(schema_name: str) -> "Validator":
+    """
+    Построить валидатор jsonschema для схемы один раз на процесс.
+    """
+    from jsonschema.validators import validator_for
+
+    schema = ROUTES_SCHEMA if schema_name == "routes" else ROUTE_SCHEMA
+    cls = validator_for(schema)
+    cls.check_schema(schema)
+    return cls(schema)
+
+
+def _raise_for_errors(instance: Any, schema_name: str) -> None:
+    """
+    Проверить данные полным валидатором и выбросить наиболее подходящую
+    ошибку так же, как это делает jsonschema.validate.
+    """
+    from jsonschema.exceptions import best_match
+
+    error = best_match(_compiled_validator(schema_name).iter_errors(instance))
+    if error is not None:
+        raise error
+
+
+def _is_route_record(item: Any) -> bool:
+    """
+    Быстрая проверка записи маршрута фиксированной структуры.
+    """
+    return (
+        type(item) is dict
+        and item.get("__type__") == "Route"
+        and type(item.get("start")) is str
+        and type(item.get("end")) is str
+        and type(item.get("number")) is int
+    )
+
+
+def validate_route(item: Any) -> None:
+    """
+    Проверить одну запись о маршруте. Записи, не прошедшие быструю
+    проверку, передаются jsonschema для подробного сообщения об ошибке.
+    """
+    if not _is_route_record(item):
+        _raise_for_errors(item, "route")
+
+
+def validate_routes(data: Any) -> None:
+    """
+    Проверить список записей о маршрутах.
+    """
+    if type(data) is not list or not all(map(_is_route_record, data)):
+        _raise_for_errors(data, "routes")
+
+
+def journal_path(file_path: Path) -> Path:
+    """
+    Получить путь к журналу добавленных маршрутов для файла данных.
+    """
+    return file_path.with_name(file_path.name + JOURNAL_SUFFIX)
+
+
+def lock_path(file_path: Path) -> Path:
+    """
+    Получить путь к файлу блокировки для файла данных.
+    """
+    return file_path.with_name(file_path.name + LOCK_SUFFIX)
+
+
+# Метаданные файла: номер узла, время изменения и размер (None, если
+# файла нет).
+FileStat = tuple[int, int, int] | None
+# Версия файла данных: счетчик сохранений из файла блокировки и
+# метаданные файла и его журнала.
+FileVersion = tuple[int, FileStat, FileStat]
+
+
+def file_stat(path: Path) -> FileStat:
+    """
+    Получить метаданные файла.
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def file_version(file_path: Path) -> FileVersion:
+    """
+    Получить версию файла данных. Счетчик увеличивается при каждом
+    сохранении под блокировкой и отличает версии, даже если метаданные
+    файла совпали; метаданные замечают изменения в обход блокировки.
+    """
+    return (
+        read_counter(lock_path(file_path)),
+        file_stat(file_path),
+        file_stat(journal_path(file_path)),
+    )
+
+
+def bump_version(file_path: Path) -> None:
+    """
+    Отметить изменение файла данных; вызывать под его блокировкой.
+    """
+    increment_counter(lock_path(file_path))
+
+
+def iter_json_array(file_in: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Последовательно разобрать элементы массива JSON верхнего уровня,
+    читая файл блоками заданного размера.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    # Позиция начала буфера в файле: число отброшенных символов и строк и
+    # длина отброшенной части текущей строки. Нужна, чтобы позиции в
+    # сообщениях об ошибках указывали на место в файле, а не в буфере.
+    base = lines = column = 0
+
+    def read_more(size: int) -> None:
+        nonlocal buffer, pos, eof, base, lines, column
+        chunk = file_in.read(size)
+        if chunk:
+            newlines = buffer.count("\n", 0, pos)
+            if newlines:
+                lines += newlines
+                column = pos - buffer.rfind("\n", 0, pos) - 1
+            else:
+                column += pos
+            base += pos
+            buffer = buffer[pos:] + chunk
+            pos = 0
+        else:
+            eof = True
+
+    def next_char() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer) or eof:
+                return buffer[pos] if pos < len(buffer) else ""
+            read_more(chunk_size)
+
+    def error(message: str, at: int) -> json.JSONDecodeError:
+        exc = json.JSONDecodeError(message, buffer, at)
+        newline = buffer.rfind("\n", 0, at)
+        exc.pos = base + at
+        exc.lineno = lines + buffer.count("\n", 0, at) + 1
+        exc.colno = at - newline if newline >= 0 else column + at + 1
+        exc.args = (
+            f"{message}: line {exc.lineno} column {exc.colno} (char {exc.pos})",
+        )
+        return exc
+
+    def check_end() -> None:
+        # После массива в файле допустимы только пробельные символы.
+        if next_char():
+            raise error("Extra data", pos)
+
+    if next_char() != "[":
+        raise error("Expecting '['", pos)
+    pos += 1
+    if next_char() == "]":
+        pos += 1
+        check_end()
+        return
+
+    while True:
+        next_char()
+        size = chunk_size
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as exc:
+                if eof:
+                    raise error(exc.msg, exc.pos) from None
+            else:
+                # Число на границе блока может оказаться прочитанным не
+                # полностью, поэтому значение принимается только тогда,
+                # когда за ним в буфере уже виден разделитель.
+                after = end
+                while after < len(buffer) and buffer[after].isspace():
+                    after += 1
+                if eof or after < len(buffer) and buffer[after] in ",]":
+                    break
+            read_more(size)
+            size *= 2
+        pos = end
+        yield item
+
+        delimiter = next_char()
+        pos += 1
+        if delimiter == "]":
+            check_end()
+            return
+        if delimiter != ",":
+            raise error("Expecting ',' delimiter", pos - 1)
+
+
+@dataclass(frozen=True, slots=True)
 class Route:
     start: str
     end: str
     number: int
 
 
+def route_record(route: Route) -> dict[str, Any]:
+    """
+    Получить запись о маршруте для сохранения в формате JSON.
+    """
+    # Словарь собирается явно: dataclasses.asdict копирует значения
+    # рекурсивно и в несколько раз медленнее.
+    return {
+        "__type__": route.__class__.__name__,
+        "start": route.start,
+        "end": route.end,
+        "number": route.number,
+    }
+
+
+class RouteColumns(Columns[Route]):
+    """
+    Столбцовое хранилище маршрутов: номера в массиве array, пункты в
+    таблице интернированных строк.
+    """
+
+    def __init__(self, items: Iterable[Route] = ()) -> None:
+        super().__init__(Route, (("start", STR), ("end", STR), ("number", "q")), items)
+
+
+class RouteFile(Sequence[Route]):
+    """
+    Маршруты из файла двоичного формата, отображенного в память.
+    Записи декодируются только при обращении к ним.
+    """
+
+    def __init__(self, file_path: Path) -> None:
+        self.file_path = file_path
+        with file_path.open("rb") as file_in:
+            self._mm = mmap.mmap(file_in.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._read_header()
+        except BaseException:
+            self._mm.close()
+            raise
+        self._strings: dict[int, str] = {}
+
+    def _read_header(self) -> None:
+        error = ValueError(f"{self.file_path}: неизвестный формат файла маршрутов")
+        if len(self._mm) < BINARY_HEADER.size:
+            raise error
+        fields = BINARY_HEADER.unpack_from(self._mm)
+        magic, version, _, string_count, count, blob_size = fields
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            raise error
+
+        offsets_start = BINARY_HEADER.size
+        blob_start = offsets_start + BINARY_OFFSET.size * (string_count + 1)
+        self._blob_start: int = blob_start
+        self._records_start: int = blob_start + blob_size
+        self._count: int = count
+        if self._records_start + count * BINARY_RECORD.size > len(self._mm):
+            raise ValueError(f"{self.file_path}: файл маршрутов обрезан")
+        self._offsets = [
+            offset
+            for (offset,) in BINARY_OFFSET.iter_unpack(
+                self._mm[offsets_start:blob_start]
+            )
+        ]
+        if self._offsets[-1] != blob_size:
+            raise error
+
+    def __enter__(self) -> "RouteFile":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def _string(self, idx: int) -> str:
+        value = self._strings.get(idx)
+        if value is None:
+            start = self._blob_start + self._offsets[idx]
+            end = self._blob_start + self._offsets[idx + 1]
+            value = self._mm[start:end].decode("utf-8")
+            self._strings[idx] = value
+        return value
+
+    def _string_id(self, value: str) -> int | None:
+        """
+        Найти номер строки в таблице, не декодируя остальные строки.
+        """
+        encoded = value.encode("utf-8")
+        begin, finish = self._blob_start, self._records_start
+        blob = memoryview(self._mm)[begin:finish]
+        try:
+            for idx in range(len(self._offsets) - 1):
+                start, end = self._offsets[idx], self._offsets[idx + 1]
+                if end - start == len(encoded) and blob[start:end] == encoded:
+                    return idx
+        finally:
+            blob.release()
+        return None
+
+    def _records(self, start: int = 0, stop: int | None = None) -> memoryview:
+        if stop is None:
+            stop = self._count
+        begin = self._records_start + start * BINARY_RECORD.size
+        finish = self._records_start + stop * BINARY_RECORD.size
+        return memoryview(self._mm)[begin:finish]
+
+    def _route(self, start_id: int, end_id: int, number: int) -> Route:
+        return Route(self._string(start_id), self._string(end_id), number)
+
+    def _decode_range(self, start: int, stop: int) -> list[Route]:
+        with self._records(start, stop) as records:
+            return [
+                self._route(*fields) for fields in BINARY_RECORD.iter_unpack(records)
+            ]
+
+    def __len__(self) -> int:
+        return self._count
+
+    @overload
+    def __getitem__(self, index: int) -> Route: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Route]: ...
+
+    def __getitem__(self, index: int | slice) -> Route | list[Route]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._count)
+            if step != 1:
+                return [self[idx] for idx in range(start, stop, step)]
+            return self._decode_range(start, max(start, stop))
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("index out of range")
+        offset = self._records_start + index * BINARY_RECORD.size
+        return self._route(*BINARY_RECORD.unpack_from(self._mm, offset))
+
+    def __iter__(self) -> Iterator[Route]:
+        with self._records() as records:
+            for fields in BINARY_RECORD.iter_unpack(records):
+                yield self._route(*fields)
+
+    def select(self, name_point: str) -> list[Route]:
+        """
+        Выбрать маршруты с заданным пунктом, декодируя только найденные.
+        """
+        point_id = self._string_id(name_point.lower())
+        if point_id is None:
+            return []
+        with self._records() as records:
+            return [
+                self._route(start_id, end_id, number)
+                for start_id, end_id, number in BINARY_RECORD.iter_unpack(records)
+                if start_id == point_id or end_id == point_id
+            ]
+
+    def points(self) -> list[str]:
+        """
+        Получить названия всех пунктов из таблицы строк файла.
+        """
+        return [self._string(idx) for idx in range(len(self._offsets) - 1)]
+
+    def select_points(self, names: Iterable[str]) -> list[Route]:
+        """
+        Выбрать маршруты, у которых пункт отправления или прибытия входит
+        в заданный набор, декодируя только найденные маршруты.
+        """
+        names = set(names)
+        point_ids = {idx for idx, point in enumerate(self.points()) if point in names}
+        if not point_ids:
+            return []
+        with self._records() as records:
+            return [
+                self._route(start_id, end_id, number)
+                for start_id, end_id, number in BINARY_RECORD.iter_unpack(records)
+                if start_id in point_ids or end_id in point_ids
+            ]
+
+
+def save_binary(routes: Iterable[Route], file_path: Path) -> None:
+    """
+    Сохранить маршруты в файл двоичного формата.
+    """
+    ids: dict[str, int] = {}
+    records = bytearray()
+    for route in routes:
+        start_id = ids.setdefault(route.start, len(ids))
+        end_id = ids.setdefault(route.end, len(ids))
+        records += BINARY_RECORD.pack(start_id, end_id, route.number)
+
+    encoded = [value.encode("utf-8") for value in ids]
+    offsets = bytearray(BINARY_OFFSET.pack(0))
+    total = 0
+    for value in encoded:
+        total += len(value)
+        offsets += BINARY_OFFSET.pack(total)
+
+    with atomic_write(file_path, "wb") as file_out:
+        file_out.write(
+            BINARY_HEADER.pack(
+                BINARY_MAGIC,
+                BINARY_VERSION,
+                0,
+                len(encoded),
+                len(records) // BINARY_RECORD.size,
+                total,
+            )
+        )
+        file_out.write(offsets)
+        file_out.writelines(encoded)
+        file_out.write(records)
+
+
+RouteKey = tuple[str, str, int]
+
+
 @dataclass
 class Routes:
-    routes: List[Route] = field(default_factory=list)
+    routes: Sequence[Route] = field(default_factory=list)
+    # Хеш-индекс ключей маршрутов для проверки дубликатов за O(1).
+    # Строится лениво при первом добавлении.
+    _keys: set[RouteKey] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # Инвертированный индекс: пункт отправления или прибытия -> маршруты,
+    # упорядоченные по номеру. Строится лениво при первом запросе.
+    _points: dict[str, List[Route]] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # Граф маршрутов для поиска путей. Строится лениво при первом запросе
+    # и затем пополняется вместе с остальными индексами.
+    _graph: "RouteGraph | None" = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
-    def add(self, start: str, end: str, number: int) -> None:
+    # Индекс названий пунктов для поиска по префиксу и нечеткого поиска.
+    # Строится лениво при первом таком запросе.
+    _names: "PointIndex | None" = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @classmethod
+    def open_many(
+        cls,
+        file_paths: Sequence[Path],
+        chunk_size: int | None = None,
+        workers: int = 1,
+    ) -> "Routes":
+        """
+        Открыть набор маршрутов, разделенный на несколько файлов, и слить
+        их в один набор, упорядоченный по номеру. При workers > 1 файлы
+        загружаются параллельно в пуле процессов. Если маршрут встречается
+        в наборе дважды, возбуждается RouteExistsError.
+        """
+        shards: List[Iterable[Route]]
+        if workers > 1 and len(file_paths) > 1:
+            # Пул процессов импортируется только для параллельной загрузки:
+            # модуль multiprocessing заметно увеличивает время запуска.
+            from concurrent.futures import ProcessPoolExecutor
+
+            load = functools.partial(load_shard_columns, chunk_size=chunk_size)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                shards = [map(Route, *shard) for shard in pool.map(load, file_paths)]
+        else:
+            shards = [load_shard(file_path, chunk_size) for file_path in file_paths]
+
+        # Файлы упорядочены по номеру, поэтому достаточно k-путевого
+        # слияния; индекс ключей для проверки дубликатов строится попутно.
+        merged: List[Route] = []
+        keys: set[RouteKey] = set()
+        for route in heapq.merge(*shards, key=lambda item: item.number):
+            key = (route.start, route.end, route.number)
+            if key in keys:
+                raise RouteExistsError(route)
+            keys.add(key)
+            merged.append(route)
+        routes = cls(merged)
+        routes._keys = keys
+        return routes
+
+    @classmethod
+    def open(cls, file_path: Path, chunk_size: int | None = None) -> "Routes":
+        """
+        Открыть файл маршрутов. Файл двоичного формата отображается в
+        память без декодирования записей, файл JSON загружается. Затем
+        применяются маршруты из журнала, если он существует.
+        """
+        if file_path.suffix == BINARY_SUFFIX:
+            routes = cls(RouteFile(file_path))
+        else:
+            routes = cls()
+            routes.load(file_path, chunk_size)
+        routes.replay_journal(file_path)
+        return routes
+
+    def _writable(self) -> MutableSequence[Route]:
+        """
+        Получить изменяемый список маршрутов. Маршруты, открытые только
+        для чтения, при первом изменении копируются в обычный список.
+        """
+        if not isinstance(self.routes, MutableSequence):
+            routes = list(self.routes)
+            if isinstance(self.routes, RouteFile):
+                self.routes.close()
+            self.routes = routes
+        return self.routes
+
+    def _key_index(self) -> set[RouteKey]:
+        """
+        Получить индекс ключей маршрутов, построив его при необходимости.
+        """
+        if self._keys is None:
+            self._keys = {
+                (route.start, route.end, route.number) for route in self.routes
+            }
+        return self._keys
+
+    def _point_index(self) -> dict[str, List[Route]]:
+        """
+        Получить индекс пунктов маршрутов, построив его при необходимости.
+        """
+        if self._points is None:
+            self._points = {}
+            for route in self.routes:
+                self._points.setdefault(route.start, []).append(route)
+                if route.end != route.start:
+                    self._points.setdefault(route.end, []).append(route)
+        return self._points
+
+    def graph(self) -> "RouteGraph":
+        """
+        Получить граф маршрутов, построив его при необходимости.
+        """
+        if self._graph is None:
+            from route_graph import RouteGraph
+
+            self._graph = RouteGraph(self.routes)
+        return self._graph
+
+    def point_index(self) -> "PointIndex":
+        """
+        Получить индекс названий пунктов, построив его при необходимости.
+        """
+        if self._names is None:
+            from point_index import PointIndex
+
+            if self._points is None and isinstance(self.routes, RouteFile):
+                self._names = PointIndex(self.routes.points())
+            else:
+                self._names = PointIndex(self._point_index())
+        return self._names
+
+    def _register(self, route: Route, in_order: bool = True) -> None:
+        """
+        Внести маршрут в уже построенные индексы.
+        """
+        if self._graph is not None:
+            self._graph.add(route)
+        if self._keys is not None:
+            self._keys.add((route.start, route.end, route.number))
+        if self._names is not None:
+            self._names.add(route.start)
+            self._names.add(route.end)
+        if self._points is not None:
+            for point in {route.start, route.end}:
+                bucket = self._points.setdefault(point, [])
+                if in_order:
+                    bisect.insort(bucket, route, key=lambda item: item.number)
+                else:
+                    bucket.append(route)
+
+    def add(self, start: str, end: str, number: int) -> Route:
         """
         Добавить данные о маршруте.
         """
@@ -70,39 +757,100 @@ class Routes:
             end.lower(),
             number,
         )
-        if route not in self.routes:
-            bisect.insort(
-                self.routes,
-                route,
-                key=lambda item: item.number,
-            )
-        else:
+        if (route.start, route.end, route.number) in self._key_index():
             raise RouteExistsError(route)
 
+        bisect.insort(
+            self._writable(),
+            route,
+            key=lambda item: item.number,
+        )
+        self._register(route)
+        return route
+
+    def add_many(self, items: Iterable[tuple[str, str, int]]) -> int:
+        """
+        Добавить пакет маршрутов за один проход, пропуская дубликаты.
+        Возвращает количество добавленных маршрутов.
+        """
+        keys = self._key_index()
+        batch: List[Route] = []
+        for start, end, number in items:
+            route = Route(start.lower(), end.lower(), number)
+            key = (route.start, route.end, route.number)
+            if key not in keys:
+                keys.add(key)
+                batch.append(route)
+
+        if batch:
+            # Сортировка устойчива, поэтому порядок маршрутов с одинаковым
+            # номером совпадает с порядком поочередного добавления.
+            routes = self._writable()
+            routes.extend(batch)
+            if isinstance(routes, list):
+                routes.sort(key=lambda item: item.number)
+            else:
+                routes[:] = sorted(routes, key=lambda item: item.number)
+            indexes = (self._points, self._graph, self._names)
+            if any(index is not None for index in indexes):
+                for route in batch:
+                    self._register(route)
+        return len(batch)
+
+    def iter_table(self, first: int = 1) -> Iterator[str]:
+        """
+        Получить строки таблицы маршрутов по одной, нумеруя маршруты
+        начиная с first.
+        """
+        if not self.routes:
+            yield "Список маршрутов пуст."
+            return
+        yield TABLE_LINE
+        yield TABLE_HEADER
+        yield TABLE_LINE
+        for idx, route in enumerate(self.routes, first):
+            yield TABLE_ROW.format(idx, route.start, route.end, route.number)
+        yield TABLE_LINE
+
     def __str__(self) -> str:
         """
         Отобразить список маршрутов.
         """
-        if self.routes:
-            table = []
-            line = "+-{}-+-{}-+-{}-+-{}-+".format("-" * 4, "-" * 30, "-" * 20, "-" * 16)
-            table.append(line)
-            table.append(
-                "| {:^4} | {:^30} | {:^20} | {:^16} |".format(
-                    "No", "Начало", "Конец", "Номер маршрута"
-                )
-            )
-            table.append(line)
-            for idx, route in enumerate(self.routes, 1):
-                table.append(
-                    "| {:^4} | {:<30} | {:<20} | {:>16} |".format(
-                        idx, route.start, route.end, route.number
-                    )
+        return "\n".join(self.iter_table())
+
+    def page(self, offset: int = 0, limit: int | None = None) -> "Routes":
+        """
+        Получить limit маршрутов (все оставшиеся, если limit не задан),
+        пропустив первые offset. Маршруты из файла двоичного формата за
+        пределами страницы не декодируются.
+        """
+        if offset == 0 and limit is None:
+            return self
+        stop = None if limit is None else offset + limit
+        return Routes(self.routes[offset:stop])
+
+    def write(self, file: TextIO, fmt: str = "table", first: int = 1) -> None:
+        """
+        Вывести маршруты в файл построчно в заданном формате, не
+        собирая весь вывод в памяти.
+        """
+        match fmt:
+            case "table":
+                for line in self.iter_table(first):
+                    file.write(line + "\n")
+            case "jsonl":
+                # json.dumps с параметрами создает кодировщик при каждом вызове.
+                encode = json.JSONEncoder(ensure_ascii=False).encode
+                for route in self.routes:
+                    file.write(encode(route_record(route)) + "\n")
+            case "csv":
+                writer = csv.writer(file, lineterminator="\n")
+                writer.writerow(("start", "end", "number"))
+                writer.writerows(
+                    (route.start, route.end, route.number) for route in self.routes
                 )
-            table.append(line)
-            return "\n".join(table)
-        else:
-            return "Список маршрутов пуст."
+            case _:
+                raise ValueError(f"Неизвестный формат вывода: {fmt}")
 
     def __len__(self) -> int:
         return len(self.routes)
@@ -111,79 +859,414 @@ class Routes:
         """
         Выбрать маршруты с заданным пунктом отправления или прибытия.
         """
-        selected: List[Route] = []
-        for route in self.routes:
-            if route.start == name_point.lower() or route.end == name_point.lower():
-                selected.append(route)
+        if self._points is None and isinstance(self.routes, RouteFile):
+            return Routes(self.routes.select(name_point))
+        return Routes(list(self._point_index().get(name_point.lower(), [])))
 
-        return Routes(selected)
+    def select_points(self, names: Iterable[str]) -> "Routes":
+        """
+        Выбрать маршруты, пункт отправления или прибытия которых входит в
+        заданный набор названий, в порядке номеров маршрутов.
+        """
+        if self._points is None and isinstance(self.routes, RouteFile):
+            return Routes(self.routes.select_points(names))
+        index = self._point_index()
+        # Маршрут между двумя пунктами набора лежит в обеих корзинах.
+        selected = {id(route): route for name in names for route in index.get(name, [])}
+        return Routes(sorted(selected.values(), key=lambda item: item.number))
+
+    def select_prefix(self, prefix: str) -> "Routes":
+        """
+        Выбрать маршруты с пунктом, название которого начинается с prefix.
+        """
+        return self.select_points(self.point_index().prefix(prefix))
+
+    def select_fuzzy(self, name_point: str, distance: int = 1) -> "Routes":
+        """
+        Выбрать маршруты с пунктом, название которого отличается от
+        заданного не более чем на distance правок.
+        """
+        return self.select_points(self.point_index().fuzzy(name_point, distance))
 
     def save(self, file_path: Path) -> None:
         """
-        Сохранить все маршруты в файл JSON.
+        Сохранить все маршруты в файл JSON или, если файл имеет
+        расширение .bin, в файл двоичного формата.
         """
+        if file_path.suffix == BINARY_SUFFIX:
+            save_binary(self.routes, file_path)
+            return
+
         # Открыть файл с заданным именем для записи.
-        with file_path.open("w", encoding="utf-8") as file_out:
-            data_with_type = [
-                {"__type__": route.__class__.__name__, **asdict(route)}
-                for route in self.routes
-            ]
+        with atomic_write(file_path, "w", encoding="utf-8") as file_out:
+            data_with_type = [route_record(route) for route in self.routes]
             # Записать данные из словаря в формат JSON и сохранить их
             # в открытый файл.
             json.dump(data_with_type, file_out, ensure_ascii=False, indent=4)
 
-    def load(self, file_path: Path) -> None:
-        """
-        Загрузить все маршруты из файла JSON.
-        """
-        schema = {
-            "type": "array",
-            "items": {
-                "type": "object",
-                "properties": {
-                    "__type__": {"type": "string", "enum": ["Route"]},
-                    "start": {"type": "string"},
-                    "end": {"type": "string"},
-                    "number": {"type": "integer"},
-                },
-                "required": [
-                    "__type__",
-                    "start",
-                    "end",
-                    "number",
-                ],
-            },
-        }
+    def compact(self, file_path: Path) -> None:
+        """
+        Атомарно сохранить все маршруты в файл и удалить его журнал.
+        """
+        self.save(file_path)
+        journal_path(file_path).unlink(missing_ok=True)
+
+    def append_journal(self, file_path: Path, route: Route) -> int:
+        """
+        Дописать маршрут в журнал файла и вернуть число записей в журнале.
+        """
+        line = json.dumps(route_record(route), ensure_ascii=False) + "\n"
+        with journal_path(file_path).open("a+b") as file_out:
+            file_out.seek(0)
+            data = file_out.read()
+            # Отбросить незавершенную строку, оставшуюся после сбоя.
+            if data and not data.endswith(b"\n"):
+                file_out.truncate(data.rfind(b"\n") + 1)
+            file_out.write(line.encode("utf-8"))
+            file_out.flush()
+            os.fsync(file_out.fileno())
+        return data.count(b"\n") + 1
+
+    def replay_journal(self, file_path: Path) -> int:
+        """
+        Добавить маршруты из журнала файла, пропуская уже имеющиеся, и
+        вернуть число записей в журнале. Незавершенная последняя строка,
+        оставшаяся после сбоя при записи, игнорируется.
+        """
+        path = journal_path(file_path)
+        if not path.exists():
+            return 0
+
+        items: List[tuple[str, str, int]] = []
+        with path.open("r", encoding="utf-8") as file_in:
+            for line in file_in:
+                if not line.endswith("\n"):
+                    break
+                item = json.loads(line)
+                validate_route(item)
+                items.append((item["start"], item["end"], item["number"]))
+        self.add_many(items)
+        return len(items)
+
+    def load(self, file_path: Path, chunk_size: int | None = None) -> None:
+        """
+        Загрузить все маршруты из файла JSON. Если задан размер блока,
+        файл разбирается потоково, по одному элементу за раз. Файлы с
+        расширением .bin читаются в двоичном формате.
+        """
+        if file_path.suffix == BINARY_SUFFIX:
+            with RouteFile(file_path) as route_file:
+                self._extend(route_file)
+            return
+
+        if chunk_size is not None:
+            self._load_stream(file_path, chunk_size)
+            return
+
         # Открыть файл с заданным именем и прочитать его содержимое.
         with file_path.open("r", encoding="utf-8") as file_in:
             data = json.load(file_in)  # Прочитать данные из файла
 
-        validate(instance=data, schema=schema)
-        for route in data:
-            route.pop("__type__", None)
-            self.routes.append(Route(**route))
+        validate_routes(data)
+        self._extend(map(item_route, data))
+
+    def _load_stream(self, file_path: Path, chunk_size: int) -> None:
+        """
+        Загрузить маршруты, проверяя и добавляя каждый элемент массива
+        сразу после его разбора.
+        """
+
+        def checked(item: dict[str, Any]) -> Route:
+            validate_route(item)
+            return item_route(item)
+
+        with file_path.open("r", encoding="utf-8") as file_in:
+            self._extend(map(checked, iter_json_array(file_in, chunk_size)))
+
+    def _extend(self, routes: Iterable[Route]) -> None:
+        """
+        Добавить маршруты в конец списка. Изменяемый список и наличие
+        индексов определяются один раз, а не для каждого маршрута.
+        """
+        writable = self._writable()
+        indexes = (self._keys, self._points, self._graph, self._names)
+        if any(index is not None for index in indexes):
+            for route in routes:
+                writable.append(route)
+                self._register(route, in_order=False)
+        elif isinstance(writable, list):
+            writable.extend(routes)
+        else:
+            for route in routes:
+                writable.append(route)
+
+
+def item_route(item: dict[str, Any]) -> Route:
+    """
+    Получить маршрут из проверенной записи JSON.
+    """
+    return Route(item["start"], item["end"], item["number"])
+
+
+# Маршруты файла набора по столбцам: пункты отправления, пункты прибытия
+# и номера. Процессы пула передают столбцы, а не объекты Route: списки
+# строк и чисел сериализуются в несколько раз быстрее.
+ShardColumns = tuple[List[str], List[str], List[int]]
+
+
+def load_shard(file_path: Path, chunk_size: int | None = None) -> List[Route]:
+    """
+    Загрузить маршруты одного файла набора, упорядоченные по номеру.
+    """
+    routes = Routes.open(file_path, chunk_size)
+    shard = list(routes.routes)
+    if isinstance(routes.routes, RouteFile):
+        routes.routes.close()
+    if any(first.number > second.number for first, second in zip(shard, shard[1:])):
+        shard.sort(key=lambda item: item.number)
+    return shard
+
+
+def load_shard_columns(file_path: Path, chunk_size: int | None = None) -> ShardColumns:
+    """
+    Загрузить маршруты одного файла набора в процессе пула.
+    """
+    shard = load_shard(file_path, chunk_size)
+    return (
+        [route.start for route in shard],
+        [route.end for route in shard],
+        [route.number for route in shard],
+    )
+
+
+def find_files(directory: Path, names: Iterable[str]) -> List[Path]:
+    """
+    Получить пути файлов данных в каталоге по именам и шаблонам glob.
+    Журналы и файлы блокировок в шаблоны не попадают, повторы
+    отбрасываются.
+    """
+    paths: List[Path] = []
+    for name in names:
+        if not any(char in name for char in "*?["):
+            paths.append(directory / name)
+            continue
+        matched = sorted(
+            path
+            for path in directory.glob(name)
+            if path.is_file() and path.suffix not in (JOURNAL_SUFFIX, LOCK_SUFFIX)
+        )
+        if not matched:
+            raise FileNotExistsError(
+                directory / name, "Нет файлов, подходящих под шаблон"
+            )
+        paths.extend(matched)
+    return list(dict.fromkeys(paths))
+
+
+# Загруженный набор маршрутов вместе с версией файла, из которого он
+# был загружен.
+CachedRoutes = tuple[FileVersion, Routes]
+
+
+def open_cached(
+    file_path: Path,
+    command: str,
+    chunk_size: int | None = None,
+    datasets: dict[Path, CachedRoutes] | None = None,
+) -> CachedRoutes:
+    """
+    Открыть файл маршрутов и вернуть его вместе с версией. Если файл не
+    изменился с момента загрузки набора из словаря datasets, файл повторно
+    не читается. Если файла нет, возвращается пустой набор, а для команд
+    вывода возбуждается FileNotExistsError.
+    """
+    # Версия читается до загрузки: если файл изменится во время загрузки,
+    # версия окажется устаревшей и набор просто загрузится заново.
+    version = file_version(file_path)
+    if os.path.exists(file_path):
+        key = file_path.resolve()
+        cached = datasets.pop(key, None) if datasets is not None else None
+        if cached is not None and cached[0] == version:
+            return cached
+        routes = Routes.open(file_path, chunk_size)
+        logging.info(f"Загружены маршруты из файла {file_path}")
+        return version, routes
+    if command in ("list", "select", "convert", "path"):
+        raise FileNotExistsError(
+            file_path,
+            f'Файл не найден, для команды "{command}" необходим существующий файл',
+        )
+    logging.info(f"Файл {file_path} не найден, будет создан при сохранении.")
+    return version, Routes()
+
+
+def save_route(
+    routes: Routes, file_path: Path, route: Route, journal: bool = False
+) -> None:
+    """
+    Сохранить добавленный маршрут: дописать его в журнал файла или
+    сохранить весь файл. Вызывается под блокировкой файла.
+    """
+    bump_version(file_path)
+    if journal and os.path.exists(file_path):
+        pending = routes.append_journal(file_path, route)
+        logging.info(f"Маршрут записан в журнал файла {file_path}")
+        # Перенести журнал в основной файл при достижении предела.
+        if pending < JOURNAL_LIMIT:
+            return
+    routes.compact(file_path)
+    logging.info(f"Сохранены маршруты в файл {file_path}")
+
+
+def add_route(
+    file_path: Path,
+    start: str,
+    end: str,
+    number: int,
+    journal: bool = False,
+    optimistic: bool = False,
+    chunk_size: int | None = None,
+    datasets: dict[Path, CachedRoutes] | None = None,
+) -> CachedRoutes:
+    """
+    Добавить маршрут в файл и вернуть набор маршрутов с новой версией
+    файла. Файл загружается, изменяется и сохраняется под исключительной
+    блокировкой, поэтому одновременные добавления из разных процессов не
+    теряются. В оптимистичном режиме файл загружается и изменяется без
+    блокировки, а под блокировкой только сохраняется, если его версия не
+    изменилась; иначе попытка повторяется с загрузкой новой версии.
+    """
+    if not optimistic:
+        with file_lock(lock_path(file_path)):
+            _, routes = open_cached(file_path, "add", chunk_size, datasets)
+            save_route(routes, file_path, routes.add(start, end, number), journal)
+            logging.info(f"Добавлен маршрут: {start} -> {end} ({number})")
+            return file_version(file_path), routes
+
+    for attempt in range(OPTIMISTIC_RETRIES):
+        version, routes = open_cached(file_path, "add", chunk_size, datasets)
+        route = routes.add(start, end, number)
+        with file_lock(lock_path(file_path)):
+            if file_version(file_path) == version:
+                save_route(routes, file_path, route, journal)
+                logging.info(f"Добавлен маршрут: {start} -> {end} ({number})")
+                return file_version(file_path), routes
+        logging.warning(
+            f"Файл {file_path} изменен другим процессом, попытка {attempt + 1}"
+        )
+        time.sleep(random.uniform(0, OPTIMISTIC_BACKOFF * 2**attempt))
+    raise ConcurrentUpdateError(file_path)
+
+
+def positive(value: str) -> int:
+    """
+    Преобразовать аргумент командной строки в положительное число.
+    """
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"ожидается положительное число: {value}")
+    return number
+
+
+def non_negative(value: str) -> int:
+    """
+    Преобразовать аргумент командной строки в неотрицательное число.
+    """
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"ожидается неотрицательное число: {value}")
+    return number
 
 
-def main(command_line: list[str] | None = None) -> None:
+def main(
+    command_line: list[str] | None = None,
+    datasets: dict[Path, CachedRoutes] | None = None,
+) -> None:
     """
-    Главная функция программы.
+    Главная функция программы. Если задан словарь загруженных наборов
+    маршрутов, файлы, не изменившиеся с момента загрузки, повторно не
+    читаются.
     """
-    logging.basicConfig(
-        filename="app.log",
-        filemode="a",
-        encoding="utf-8",
-        format="%(asctime)s.%(msecs)03d - %(levelname)s - %(message)s",
-        level=logging.INFO,
+    argv = sys.argv[1:] if command_line is None else list(command_line)
+    # Команда для сервера передается до настройки журналирования и
+    # построения парсера: клиенту нужна только функция отправки команды.
+    socket_path, command = socket_command(argv)
+    if socket_path is not None:
+        response = send_command(Path(socket_path), command)
+        sys.stdout.write(response["stdout"])
+        if response["stderr"]:
+            raise ServerError(command, response["stderr"])
+        return
+
+    # Журналирование настраивается до разбора аргументов, чтобы ошибки
+    # разбора тоже попадали в журнал.
+    configure_logging(
+        "app.log",
+        "%(asctime)s.%(msecs)03d - %(levelname)s - %(message)s",
+        use_queue="--async-log" in argv,
     )
-    file_parser = CustomArgumentParser(add_help=False)
-    file_parser.add_argument(
+    location_parser = CustomArgumentParser(add_help=False)
+    location_parser.add_argument(
         "--home",
         action="store_true",
         help="Save the file in the user's home directory",
     )
+    location_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Load the file incrementally, one route at a time",
+    )
+    file_parser = CustomArgumentParser(add_help=False, parents=[location_parser])
     file_parser.add_argument("filename", action="store", help="The data file name")
+    # Команды вывода принимают набор маршрутов из нескольких файлов.
+    files_parser = CustomArgumentParser(add_help=False, parents=[location_parser])
+    files_parser.add_argument(
+        "filename",
+        action="store",
+        nargs="+",
+        help="The data file names or glob patterns, merged by route number",
+    )
+    files_parser.add_argument(
+        "-w",
+        "--workers",
+        action="store",
+        type=positive,
+        default=1,
+        help="Load several files in this many processes",
+    )
+    output_parser = CustomArgumentParser(add_help=False)
+    output_parser.add_argument(
+        "--offset",
+        action="store",
+        type=non_negative,
+        default=0,
+        help="Skip this many routes",
+    )
+    output_parser.add_argument(
+        "--limit",
+        action="store",
+        type=non_negative,
+        help="Display at most this many routes",
+    )
+    output_parser.add_argument(
+        "--format",
+        action="store",
+        choices=OUTPUT_FORMATS,
+        default="table",
+        help="The output format (default table)",
+    )
     parser = CustomArgumentParser("routes")
     parser.add_argument("--version", action="version", version="%(prog)s 0.2.0")
+    parser.add_argument(
+        "--async-log",
+        action="store_true",
+        help="Write the log from a background thread in batches",
+    )
+    parser.add_argument(
+        "--socket",
+        action="store",
+        help="Send the command to the routes server listening on this Unix socket",
+    )
     subparsers = parser.add_subparsers(dest="command")
     add = subparsers.add_parser("add", parents=[file_parser], help="Add a new route")
     add.add_argument(
@@ -200,83 +1283,214 @@ def main(command_line: list[str] | None = None) -> None:
         required=True,
         help="The number of route",
     )
+    add.add_argument(
+        "--journal",
+        action="store_true",
+        help="Append the route to the file journal instead of rewriting the file",
+    )
+    add.add_argument(
+        "--optimistic",
+        action="store_true",
+        help="Load the file without locking it and retry if another process "
+        "changes it before saving",
+    )
 
-    _ = subparsers.add_parser("list", parents=[file_parser], help="Display all routes")
+    _ = subparsers.add_parser(
+        "list", parents=[files_parser, output_parser], help="Display all routes"
+    )
 
     select = subparsers.add_parser(
-        "select", parents=[file_parser], help="Select the routes"
+        "select", parents=[files_parser, output_parser], help="Select the routes"
     )
-    select.add_argument(
+    query = select.add_mutually_exclusive_group(required=True)
+    query.add_argument(
         "-p",
         "--point",
         action="store",
-        required=True,
         help="Routes starting or ending at this point",
     )
+    query.add_argument(
+        "--prefix",
+        action="store",
+        help="Routes starting or ending at a point whose name starts with this",
+    )
+    query.add_argument(
+        "--fuzzy",
+        action="store",
+        help="Routes starting or ending at a point whose name is close to this",
+    )
+    select.add_argument(
+        "-d",
+        "--distance",
+        action="store",
+        type=non_negative,
+        default=1,
+        help="The largest number of edits for --fuzzy (default 1)",
+    )
+
+    convert = subparsers.add_parser(
+        "convert",
+        parents=[file_parser],
+        help="Convert the data file to the format given by the output extension",
+    )
+    convert.add_argument(
+        "-o",
+        "--output",
+        action="store",
+        required=True,
+        help="The output file name (.json or .bin)",
+    )
+
+    path = subparsers.add_parser(
+        "path",
+        parents=[file_parser],
+        help="Find the way between two points with the fewest transfers",
+    )
+    path.add_argument(
+        "-s", "--start", action="store", required=True, help="The start point"
+    )
+    path.add_argument(
+        "-e", "--end", action="store", required=True, help="The destination point"
+    )
+
+    _ = subparsers.add_parser(
+        "serve", help="Serve routes commands over the Unix socket given by --socket"
+    )
+
+    args = parser.parse_args(argv)
 
-    args = parser.parse_args(command_line)
+    if args.command == "serve":
+        if args.socket is None:
+            parser.error('для команды "serve" необходим параметр --socket')
+        from routes_server import serve
+
+        serve(Path(args.socket), main, report_error)
+        return
 
     # Загрузить всех работников из файла, если файл существует.
-    is_dirty = False
-    routes = Routes()
-    if args.home:
-        filepath: Path = Path.home() / args.filename
+    cached: CachedRoutes | None = None
+    directory = Path.home() if args.home else Path("json")
+    if isinstance(args.filename, list):
+        filepaths = find_files(directory, args.filename)
     else:
-        filepath = Path("json") / args.filename
+        filepaths = [directory / args.filename]
+    filepath = filepaths[0]
+    chunk_size = CHUNK_SIZE if args.stream else None
 
-    if os.path.exists(filepath):
-        routes.load(filepath)
-        logging.info(f"Загружены маршруты из файла {filepath}")
-    elif args.command.lower() in ("list", "select"):
-        raise FileNotExistsError(
+    if len(filepaths) > 1:
+        for shard_path in filepaths:
+            if not shard_path.exists():
+                raise FileNotExistsError(
+                    shard_path,
+                    f'Файл не найден, для команды "{args.command.lower()}" '
+                    "необходим существующий файл",
+                )
+        routes = Routes.open_many(filepaths, chunk_size, args.workers)
+        logging.info(f"Загружены маршруты из {len(filepaths)} файлов")
+    elif args.command.lower() == "add":
+        cached = add_route(
             filepath,
-            f'Файл не найден, для команды "{args.command.lower()}" '
-            "необходим существующий файл",
+            args.start,
+            args.end,
+            args.number,
+            journal=args.journal,
+            optimistic=args.optimistic,
+            chunk_size=chunk_size,
+            datasets=datasets,
         )
+        routes = cached[1]
     else:
-        logging.info(f"Файл {filepath} не найден, будет создан при сохранении.")
+        cached = open_cached(filepath, args.command.lower(), chunk_size, datasets)
+        routes = cached[1]
 
     match args.command.lower():
-        case "add":
-            routes.add(args.start, args.end, args.number)
-            is_dirty = True
-            logging.info(
-                f"Добавлен маршрут: {args.start} -> {args.end} ({args.number})"
-            )
-
         case "list":
-            print(routes)
-            logging.info("Выведены все маршруты")
+            page = routes.page(args.offset, args.limit)
+            page.write(sys.stdout, args.format, args.offset + 1)
+            if args.offset or args.limit is not None:
+                logging.info(
+                    f"Выведено {len(page)} маршрутов, начиная с {args.offset + 1}"
+                )
+            else:
+                logging.info("Выведены все маршруты")
 
         case "select":
-            name_point = args.point
-            selected = routes.select(name_point)
-            print(selected)
+            if args.prefix is not None:
+                selected = routes.select_prefix(args.prefix)
+                where = f"в точке, название которой начинается с {args.prefix}"
+            elif args.fuzzy is not None:
+                selected = routes.select_fuzzy(args.fuzzy, args.distance)
+                where = f"в точке, название которой близко к {args.fuzzy}"
+            else:
+                selected = routes.select(args.point)
+                where = f"в точке {args.point}"
+            selected.page(args.offset, args.limit).write(
+                sys.stdout, args.format, args.offset + 1
+            )
             if selected:
                 logging.info(
                     f"Найдено {len(selected)} маршрутов, "
-                    f"начинающихся или заканчивающихся в точке {name_point}"
+                    f"начинающихся или заканчивающихся {where}"
                 )
             else:
                 logging.warning(
-                    f"Найдено 0 маршрутов, "
-                    f"начинающихся или заканчивающихся в точке {name_point}"
+                    f"Найдено 0 маршрутов, начинающихся или заканчивающихся {where}"
                 )
 
-    if is_dirty:
-        routes.save(filepath)
-        logging.info(f"Сохранены маршруты в файл {filepath}")
+        case "path":
+            from route_graph import count_transfers
+
+            legs = routes.graph().path(args.start, args.end)
+            if legs is None:
+                print(f"Путь из пункта {args.start} в пункт {args.end} не найден.")
+                logging.warning(
+                    f"Не найден путь из пункта {args.start} в пункт {args.end}"
+                )
+            else:
+                transfers = count_transfers(legs)
+                print(Routes(legs))
+                print(f"Пересадок: {transfers}")
+                logging.info(
+                    f"Найден путь из пункта {args.start} в пункт {args.end}: "
+                    f"{len(legs)} маршрутов, {transfers} пересадок"
+                )
+
+        case "convert":
+            output = filepath.parent / args.output
+            with file_lock(lock_path(output)):
+                routes.compact(output)
+                bump_version(output)
+            logging.info(f"Маршруты из файла {filepath} сохранены в файл {output}")
+
+    if datasets is not None and cached is not None and os.path.exists(filepath):
+        datasets[filepath.resolve()] = cached
+
+
+def report_error(exc: Exception) -> str:
+    """
+    Записать ошибку в журнал и получить сообщение для пользователя.
+    """
+    # Ошибка валидации возможна, только если пакет jsonschema загружен.
+    if "jsonschema" in sys.modules:
+        from jsonschema import ValidationError
+
+        if isinstance(exc, ValidationError):
+            logging.error(f"Ошибка валидации: {exc}")
+            return f"Ошибка валидации: {exc.message}"
+    if isinstance(exc, argparse.ArgumentError):
+        logging.error(f"Ошибка аргумента командной строки: {exc}")
+        return f"Ошибка аргумента командной строки: {exc}"
+    if isinstance(exc, ServerError):
+        # Ошибка уже записана в журнал сервером.
+        return str(exc)
+    import traceback
+
+    logging.error(f"Ошибка:\n{''.join(traceback.format_exception(exc))}")
+    return str(exc)
 
 
 if __name__ == "__main__":
     try:
         main()
-    except ValidationError as exc:
-        logging.error(f"Ошибка валидации: {exc}")
-        print(f"Ошибка валидации: {exc.message}", file=sys.stderr)
-    except argparse.ArgumentError as exc:
-        logging.error(f"Ошибка аргумента командной строки: {exc}")
-        print(f"Ошибка аргумента командной строки: {exc}", file=sys.stderr)
     except Exception as exc:
-        logging.error(f"Ошибка:\n{traceback.format_exc()}")
-        print(exc, file=sys.stderr)
+        print(report_error(exc), file=sys.stderr)
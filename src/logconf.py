@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Настройка журналирования программ в файл: синхронная, как в
+# logging.basicConfig, или асинхронная, при которой записи передаются
+# через очередь фоновому потоку и записываются в файл пакетами. Модули
+# асинхронного журналирования импортируются только при его настройке.
+
+import atexit
+import logging
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from logqueue import BatchQueueListener
+
+
+class BatchFileHandler(logging.FileHandler):
+    """
+    Обработчик, записывающий записи журнала в буфер файла без сброса
+    на диск после каждой записи.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.stream is None:
+            self.stream = self._open()
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+
+def configure_logging(
+    filename: str,
+    fmt: str = logging.BASIC_FORMAT,
+    use_queue: bool = False,
+    level: int = logging.INFO,
+    logger: logging.Logger | None = None,
+) -> "BatchQueueListener | None":
+    """
+    Настроить журналирование в файл для логгера (по умолчанию корневого).
+    При use_queue записи обрабатываются фоновым потоком, который
+    запускается и возвращается функцией и останавливается с записью
+    оставшихся записей при завершении программы. Как и
+    logging.basicConfig, ничего не делает, если у логгера уже есть
+    обработчики.
+    """
+    if logger is None:
+        logger = logging.getLogger()
+    if logger.handlers:
+        return None
+    logger.setLevel(level)
+    if not use_queue:
+        file_handler = logging.FileHandler(filename, mode="a", encoding="utf-8")
+        file_handler.setFormatter(logging.Formatter(fmt))
+        logger.addHandler(file_handler)
+        return None
+
+    import queue
+    from logging.handlers import QueueHandler
+
+    from logqueue import BatchQueueListener
+
+    file_handler = BatchFileHandler(filename, mode="a", encoding="utf-8")
+    file_handler.setFormatter(logging.Formatter(fmt))
+    records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    listener = BatchQueueListener(records, file_handler)
+    logger.addHandler(QueueHandler(records))
+    listener.start()
+    atexit.register(stop_logging, listener)
+    return listener
+
+
+def stop_logging(listener: "BatchQueueListener") -> None:
+    """
+    Остановить фоновый поток журналирования, записав оставшиеся записи.
+    """
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Асинхронное журналирование: слушатель очереди записей, работающий в
+# фоновом потоке. Модуль импортируется только при настройке журналирования
+# через очередь: logging.handlers заметно увеличивает время запуска.
+
+import logging
+import queue
+from logging.handlers import QueueListener
+
+
+class BatchQueueListener(QueueListener):
+    """
+    Слушатель очереди, сбрасывающий обработчики, когда очередь опустела
+    или пришла запись об ошибке.
+    """
+
+    def __init__(
+        self,
+        records: "queue.SimpleQueue[logging.LogRecord]",
+        *handlers: logging.Handler
+    ) -> None:
+        super().__init__(records, *handlers)
+        self.records = records
+        # Признак того, что фоновый поток запущен и еще не остановлен.
+        self.running = False
+
+    def start(self) -> None:
+        super().start()
+        self.running = True
+
+    def stop(self) -> None:
+        """
+        Остановить фоновый поток, обработав оставшиеся записи. Повторный
+        вызов ничего не делает.
+        """
+        if self.running:
+            self.running = False
+            super().stop()
+
+    def handle(self, record: logging.LogRecord) -> None:
+        super().handle(record)
+        if record.levelno >= logging.ERROR or self.records.empty():
+            for handler in self.handlers:
+                handler.flush()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Индекс названий пунктов маршрутов для поиска по префиксу и нечеткого
+# поиска с ограниченным расстоянием Левенштейна. Названия хранятся в
+# отсортированном списке, который служит неявным префиксным деревом:
+# названия с общим префиксом идут в нем подряд. Модуль импортируется
+# программой маршрутов только для таких запросов.
+
+import bisect
+from typing import Iterable, List
+
+# Символ, который больше любого символа названия: все названия с
+# префиксом p лежат в отсортированном списке между p и p + MAX_CHAR.
+MAX_CHAR = "\U0010ffff"
+
+
+class PointIndex:
+    """
+    Отсортированный список различных названий пунктов в нижнем регистре.
+    """
+
+    def __init__(self, points: Iterable[str] = ()) -> None:
+        self.points: List[str] = sorted(set(points))
+        # Перевернутые названия для поиска по концу названия.
+        self.reversed: List[str] = sorted(point[::-1] for point in self.points)
+
+    def add(self, point: str) -> None:
+        """
+        Добавить название пункта, если его еще нет в индексе.
+        """
+        if point not in self:
+            bisect.insort(self.points, point)
+            bisect.insort(self.reversed, point[::-1])
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def __contains__(self, point: object) -> bool:
+        idx = bisect.bisect_left(self.points, str(point))
+        return idx < len(self.points) and self.points[idx] == point
+
+    def prefix(self, prefix: str) -> List[str]:
+        """
+        Найти названия пунктов, начинающиеся с заданной строки.
+        """
+        prefix = prefix.lower()
+        lo = bisect.bisect_left(self.points, prefix)
+        hi = prefix_end(self.points, prefix, lo)
+        return self.points[lo:hi]
+
+    def fuzzy(self, query: str, distance: int = 1) -> List[str]:
+        """
+        Найти названия пунктов, расстояние Левенштейна от которых до
+        заданной строки не больше distance.
+        """
+        # Если название отличается от запроса не более чем на distance
+        # правок, то либо его начало отличается от первой половины запроса
+        # не более чем на distance // 2 правок, либо его конец - от второй
+        # половины не более чем на (distance - 1) // 2. Первый случай
+        # ищется в списке названий, второй - в списке перевернутых
+        # названий, и в обоих случаях большая часть префиксов
+        # отбрасывается уже на первых символах.
+        query = query.lower()
+        half = len(query) // 2
+        found = set(search(self.points, query, distance, half, distance // 2))
+        found.update(
+            point[::-1]
+            for point in search(
+                self.reversed,
+                query[::-1],
+                distance,
+                len(query) - half,
+                (distance - 1) // 2,
+            )
+        )
+        return sorted(found)
+
+
+def prefix_end(points: List[str], prefix: str, lo: int = 0) -> int:
+    """
+    Получить индекс первого после lo названия, не начинающегося с prefix.
+    """
+    return bisect.bisect_left(points, prefix + MAX_CHAR, lo)
+
+
+def search(
+    points: List[str], query: str, distance: int, head: int, head_distance: int
+) -> List[str]:
+    """
+    Найти в отсортированном списке названия, расстояние Левенштейна от
+    которых до query не больше distance, среди тех, у которых некоторый
+    префикс отличается от первых head символов query не более чем на
+    head_distance правок.
+    """
+    found: List[str] = []
+    idx, stop = 0, len(points)
+    if head_distance == 0:
+        # Первые head символов должны совпасть точно: достаточно
+        # просмотреть названия с этим префиксом.
+        idx = bisect.bisect_left(points, query[:head])
+        stop = prefix_end(points, query[:head], idx)
+    # rows[d] - строка таблицы расстояний для первых d символов текущего
+    # названия, matched[d] - нашелся ли среди этих префиксов подходящий
+    # для первых head символов запроса. Строки общего с предыдущим
+    # названием префикса не пересчитываются, а если префикс уже не может
+    # подойти, пропускаются все названия, начинающиеся с него.
+    # Значения дальше distance от диагонали таблицы заведомо больше
+    # distance и не вычисляются: вместо них хранится distance + 1.
+    size, cap = len(query), distance + 1
+    rows = [[min(col, cap) for col in range(size + 1)]]
+    matched = [head <= head_distance]
+    previous = ""
+    while idx < stop:
+        point = points[idx]
+        common = 0
+        limit = min(len(previous), len(point), len(rows) - 1)
+        while common < limit and previous[common] == point[common]:
+            common += 1
+        kept = common + 1
+        del rows[kept:], matched[kept:]
+        previous = point
+
+        pruned = False
+        for depth in range(len(rows), len(point) + 1):
+            char, above = point[depth - 1], rows[-1]
+            row = [cap] * (size + 1)
+            row[0] = min(depth, cap)
+            for col in range(max(1, depth - distance), min(size, depth + distance) + 1):
+                row[col] = min(
+                    row[col - 1] + 1,
+                    above[col] + 1,
+                    above[col - 1] + (query[col - 1] != char),
+                )
+            rows.append(row)
+            matched.append(matched[-1] or row[head] <= head_distance)
+            if matched[-1]:
+                pruned = min(row) > distance
+            else:
+                pruned = min(row[: head + 1]) > head_distance
+            if pruned:
+                break
+
+        if pruned:
+            idx = prefix_end(points, point[: len(rows) - 1], idx + 1)
+            continue
+        if rows[-1][-1] <= distance:
+            found.append(point)
+        idx += 1
+    return found
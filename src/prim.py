@@ -2,12 +2,24 @@
 # -*- coding: utf-8 -*-
 
 
+import argparse
+import bisect
 import logging
 import sys
 import xml.etree.ElementTree as ET
 from dataclasses import dataclass, field
 from datetime import date
-from typing import List
+from operator import attrgetter
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, MutableSequence
+from xml.sax.saxutils import escape
+
+from columns import STR, Columns
+from fileio import atomic_write
+from logconf import configure_logging
+
+# Размер блока текста при потоковом чтении и записи файлов XML.
+CHUNK_SIZE = 1 << 16
 
 
 # Класс пользовательского исключения в случае, если неверно
@@ -34,24 +46,196 @@ class UnknownCommandError(Exception):
         return f"{self.command} -> {self.message}"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Worker:
     name: str
     post: str
     year: int
 
 
+class WorkerColumns(Columns[Worker]):
+    """
+    Столбцовое хранилище работников: годы в массиве array, имена и
+    должности в таблице интернированных строк.
+    """
+
+    def __init__(self, items: Iterable[Worker] = ()) -> None:
+        super().__init__(Worker, (("name", STR), ("post", STR), ("year", "i")), items)
+
+
+class WorkerBuilder:
+    """
+    Получатель событий парсера XML, создающий работников прямо из событий
+    без построения элементов дерева. Работниками считаются дочерние
+    элементы корня, их полями - элементы name, post и year внутри них.
+    """
+
+    def __init__(self) -> None:
+        self.workers: List[Worker] = []
+        self.depth = 0
+        self.fields: dict[str, str | None] = {}
+        # Текст текущего поля; как и у элемента дерева, он заканчивается
+        # на первом вложенном элементе.
+        self.text: List[str] = []
+        self.text_open = False
+
+    def start(self, tag: str, attrib: dict[str, str]) -> None:
+        self.depth += 1
+        if self.depth == 3:
+            self.text.clear()
+            self.text_open = True
+        elif self.depth == 4:
+            self.text_open = False
+
+    def data(self, data: str) -> None:
+        if self.depth == 3 and self.text_open:
+            self.text.append(data)
+
+    def end(self, tag: str) -> None:
+        if self.depth == 3:
+            # У пустого элемента, как и в дереве, текст равен None.
+            self.fields[tag] = "".join(self.text) or None
+        elif self.depth == 2:
+            # Работник создается один раз, когда его элемент закрыт.
+            fields, self.fields = self.fields, {}
+            name, post = fields.get("name"), fields.get("post")
+            if name is not None and post is not None and "year" in fields:
+                year = int(fields["year"] or 0)
+                self.workers.append(Worker(name=name, post=post, year=year))
+        self.depth -= 1
+
+    def close(self) -> None:
+        return None
+
+
+def check_year(year: int) -> None:
+    """
+    Проверить, что год поступления не отрицателен и не больше текущего.
+    """
+    if year < 0 or year > date.today().year:
+        raise IllegalYearError(year)
+
+
+def iter_workers(filename: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Worker]:
+    """
+    Потоково разобрать файл XML и получить работников по мере чтения
+    файла. Дерево документа не строится, поэтому память не зависит от
+    размера файла.
+    """
+    builder = WorkerBuilder()
+    parser = ET.XMLParser(target=builder)
+    # Файл передается парсеру как текст: кодировку utf8, объявленную в
+    # файлах программы, expat не распознает для многобайтных символов.
+    with open(filename, "r", encoding="utf8") as fin:
+        while chunk := fin.read(chunk_size):
+            parser.feed(chunk)
+            yield from builder.workers
+            builder.workers.clear()
+    parser.close()
+    yield from builder.workers
+
+
 @dataclass
-class Staff:
+class YearIndex:
+    """
+    Работники, упорядоченные по году поступления, для запросов по
+    диапазону лет двоичным поиском.
+    """
+
+    years: List[int] = field(default_factory=lambda: [])
     workers: List[Worker] = field(default_factory=lambda: [])
 
+    def insert(self, worker: Worker) -> None:
+        idx = bisect.bisect_right(self.years, worker.year)
+        self.years.insert(idx, worker.year)
+        self.workers.insert(idx, worker)
+
+    def append(self, worker: Worker) -> None:
+        """
+        Добавить работника с годом не меньше, чем у всех работников индекса.
+        """
+        self.years.append(worker.year)
+        self.workers.append(worker)
+
+    def range(self, first: int | None = None, last: int | None = None) -> List[Worker]:
+        """
+        Получить работников с годом поступления от first до last включительно.
+        """
+        low = 0 if first is None else bisect.bisect_left(self.years, first)
+        high = len(self.years)
+        if last is not None:
+            high = bisect.bisect_right(self.years, last, low)
+        return self.workers[low:high]
+
+
+@dataclass
+class Staff:
+    workers: MutableSequence[Worker] = field(default_factory=lambda: [])
+    # Признак того, что работники упорядочены по имени. Работники,
+    # переданные в конструктор или загруженные из файла, упорядочиваются
+    # при первом добавлении.
+    _sorted: bool = field(default=False, init=False, repr=False, compare=False)
+    # Индексы по году поступления всех работников и работников каждой
+    # должности; строятся при первом запросе.
+    _by_year: YearIndex | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _by_post: dict[str, YearIndex] = field(
+        default_factory=lambda: {}, init=False, repr=False, compare=False
+    )
+
+    def _year_index(self, post: str | None = None) -> YearIndex:
+        if self._by_year is None:
+            self._by_year = YearIndex()
+            self._by_post = {}
+            for worker in sorted(self.workers, key=attrgetter("year")):
+                self._by_year.append(worker)
+                self._by_post.setdefault(worker.post, YearIndex()).append(worker)
+        if post is None:
+            return self._by_year
+        return self._by_post.get(post, YearIndex())
+
+    def _register(self, worker: Worker) -> None:
+        if self._by_year is not None:
+            self._by_year.insert(worker)
+            self._by_post.setdefault(worker.post, YearIndex()).insert(worker)
+
+    def _sort(self) -> None:
+        if isinstance(self.workers, list):
+            self.workers.sort(key=attrgetter("name"))
+        else:
+            self.workers[:] = sorted(self.workers, key=attrgetter("name"))
+        self._sorted = True
+
     def add(self, name: str, post: str, year: int) -> None:
-        # Получить текущую дату.
-        today = date.today()
-        if year < 0 or year > today.year:
-            raise IllegalYearError(year)
-        self.workers.append(Worker(name=name, post=post, year=year))
-        self.workers.sort(key=lambda worker: worker.name)
+        check_year(year)
+        worker = Worker(name=name, post=post, year=year)
+        if self._sorted:
+            # Вставить работника после работников с тем же именем, как при
+            # устойчивой сортировке.
+            bisect.insort(self.workers, worker, key=attrgetter("name"))
+        else:
+            self.workers.append(worker)
+            self._sort()
+        self._register(worker)
+
+    def add_many(self, items: Iterable[tuple[str, str, int]]) -> int:
+        """
+        Добавить пакет работников с одной сортировкой в конце. Если год
+        поступления одного из работников неверен, не добавляется никто.
+        Возвращает количество добавленных работников.
+        """
+        batch = []
+        for name, post, year in items:
+            check_year(year)
+            batch.append(Worker(name=name, post=post, year=year))
+
+        if batch:
+            self.workers.extend(batch)
+            self._sort()
+            # Индексы по году строятся заново при следующем запросе.
+            self._by_year = None
+        return len(batch)
 
     def __str__(self) -> str:
         # Заголовок таблицы.
@@ -75,123 +259,264 @@ class Staff:
         return "\n".join(table)
 
     def select(self, period: int) -> List[Worker]:
+        """
+        Выбрать работников со стажем не меньше period лет.
+        """
         # Получить текущую дату.
         today = date.today()
-        result = []
-        for worker in self.workers:
-            if today.year - worker.year >= period:
-                result.append(worker)
-        return result
+        return self.select_range(last=today.year - period)
+
+    def select_range(
+        self,
+        first: int | None = None,
+        last: int | None = None,
+        post: str | None = None,
+    ) -> List[Worker]:
+        """
+        Выбрать работников, поступивших с first по last год включительно,
+        при необходимости только с заданной должностью. Работники
+        возвращаются в порядке имен.
+        """
+        selected = self._year_index(post).range(first, last)
+        return sorted(selected, key=attrgetter("name"))
 
     def load(self, filename: str) -> None:
-        with open(filename, "r", encoding="utf8") as fin:
-            xml = fin.read()
-
-        parser = ET.XMLParser(encoding="utf8")
-        tree = ET.fromstring(xml, parser=parser)
-        self.workers = []
-        for worker_element in tree:
-            name, post, year = None, None, None
-            for element in worker_element:
-                if element.tag == "name":
-                    name = element.text
-                elif element.tag == "post":
-                    post = element.text
-                elif element.tag == "year":
-                    year = int(element.text or 0)
-
-                if name is not None and post is not None and year is not None:
-                    self.workers.append(Worker(name=name, post=post, year=year))
-
-    def save(self, filename: str) -> None:
-        root = ET.Element("workers")
-        for worker in self.workers:
-            worker_element = ET.Element("worker")
-            name_element = ET.SubElement(worker_element, "name")
-            name_element.text = worker.name
-            post_element = ET.SubElement(worker_element, "post")
-            post_element.text = worker.post
-            year_element = ET.SubElement(worker_element, "year")
-            year_element.text = str(worker.year)
-            root.append(worker_element)
-        tree = ET.ElementTree(root)
-        with open(filename, "wb") as fout:
-            tree.write(fout, encoding="utf8", xml_declaration=True)
+        """
+        Загрузить работников из файла XML. Работники загружаются в новую
+        коллекцию того же типа, поэтому при ошибке разбора прежние данные
+        сохраняются.
+        """
+        workers = type(self.workers)()
+        workers.extend(iter_workers(filename))
+        self.workers = workers
+        self._sorted = False
+        self._by_year = None
 
+    def save(self, filename: str, chunk_size: int = CHUNK_SIZE) -> None:
+        """
+        Сохранить работников в файл XML в том же виде, что и
+        ElementTree.write. Записи работников формируются по мере обхода
+        и записываются блоками во временный файл, который заменяет файл
+        с заданным именем только после успешной записи.
+        """
+        with atomic_write(
+            Path(filename),
+            "w",
+            encoding="utf8",
+            errors="xmlcharrefreplace",
+            newline="\n",
+        ) as fout:
+            fout.write("<?xml version='1.0' encoding='utf8'?>\n")
+            if not self.workers:
+                fout.write("<workers />")
+                return
 
-if __name__ == "__main__":
-    # Выполнить настройку логгера.
-    logging.basicConfig(filename="workers.log", level=logging.INFO)
+            fout.write("<workers>")
+            chunk: List[str] = []
+            size = 0
+            for worker in self.workers:
+                record = (
+                    f"<worker>{xml_field('name', worker.name)}"
+                    f"{xml_field('post', worker.post)}"
+                    f"<year>{worker.year}</year></worker>"
+                )
+                chunk.append(record)
+                size += len(record)
+                if size >= chunk_size:
+                    fout.write("".join(chunk))
+                    chunk.clear()
+                    size = 0
+            chunk.append("</workers>")
+            fout.write("".join(chunk))
+
+
+def xml_field(tag: str, text: str) -> str:
+    """
+    Получить элемент XML с текстом; пустой элемент, как и в
+    ElementTree.write, записывается закрытым тегом.
+    """
+    return f"<{tag}>{escape(text)}</{tag}>" if text else f"<{tag} />"
+
+
+def execute(staff: Staff, command: str, read: Callable[[str], str]) -> None:
+    """
+    Выполнить команду над списком работников. Данные о работнике для
+    команды add запрашиваются функцией read.
+    """
+    if command == "add":
+        # Запросить данные о работнике.
+        name = read("Фамилия и инициалы? ")
+        post = read("Должность? ")
+        year = int(read("Год поступления? "))
+        # Добавить работника.
+        staff.add(name, post, year)
+        logging.info(f"Добавлен сотрудник: {name}, {post}, поступивший в {year} году.")
+    elif command == "list":
+        # Вывести список.
+        print(staff)
+        logging.info("Отображен список сотрудников.")
+    elif command.startswith("select "):
+        # Разбить команду на части для выделения номера года.
+        parts = command.split(maxsplit=1)
+        # Запросить работников.
+        selected = staff.select(int(parts[1]))
+        # Вывести результаты запроса.
+        if selected:
+            for idx, worker in enumerate(selected, 1):
+                print("{:>4}: {}".format(idx, worker.name))
+            logging.info(
+                f"Найдено {len(selected)} работников со "
+                f"стажем более {parts[1]} лет."
+            )
+        else:
+            print("Работники с заданным стажем не найдены.")
+            logging.warning(f"Работники со стажем более {parts[1]} лет не найдены.")
+    elif command.startswith("load "):
+        # Разбить команду на части для имени файла.
+        parts = command.split(maxsplit=1)
+        # Загрузить данные из файла.
+        filename = "XML/" + parts[1]
+        staff.load(filename)
+        logging.info(f"Загружены данные из файла {filename}.")
+    elif command.startswith("save "):
+        # Разбить команду на части для имени файла.
+        parts = command.split(maxsplit=1)
+        # Сохранить данные в файл.
+        filename = "XML/" + parts[1]
+        staff.save(filename)
+        logging.info(f"Сохранены данные в файл {filename}.")
+    elif command == "help":
+        # Вывести справку о работе с программой.
+        print("Список команд:\n")
+        print("add - добавить работника;")
+
+        print("list - вывести список работников;")
+        print("select <стаж> - запросить работников со стажем;")
+        print("load <имя_файла> - загрузить данные из файла;")
+        print("save <имя_файла> - сохранить данные в файл;")
+        print("help - отобразить справку;")
+        print("exit - завершить работу с программой.")
+    else:
+        raise UnknownCommandError(command)
+
+
+def report(exc: Exception, line: int | None = None) -> None:
+    """
+    Записать ошибку в журнал и вывести ее в поток ошибок.
+    """
+    message = str(exc) if line is None else f"Строка {line}: {exc}"
+    logging.error(f"Ошибка: {message}")
+    print(message, file=sys.stderr)
+
+
+def add_batch(staff: Staff, items: List[tuple[int, tuple[str, str, int]]]) -> int:
+    """
+    Добавить накопленных работников одним пакетом. Работники с неверным
+    годом поступления не добавляются, а об ошибках сообщается с номерами
+    строк, на которых записан год. Возвращает число ошибок.
+    """
+    valid: List[tuple[str, str, int]] = []
+    errors = 0
+    for line, item in items:
+        try:
+            check_year(item[2])
+        except IllegalYearError as exc:
+            report(exc, line)
+            errors += 1
+        else:
+            valid.append(item)
+    count = staff.add_many(valid)
+    if count:
+        logging.info(f"Добавлено сотрудников: {count}.")
+    return errors
+
+
+def run_batch(staff: Staff, lines: Iterable[str]) -> int:
+    """
+    Выполнить команды, прочитанные из файла или стандартного ввода, без
+    приглашений. После команды add следуют три строки с фамилией,
+    должностью и годом поступления. Подряд идущие команды add
+    накапливаются и выполняются одним пакетом перед следующей командой.
+    Возвращает число ошибок.
+    """
+    numbered = enumerate((line.rstrip("\r\n") for line in lines), 1)
+    line = 0
+
+    def read(prompt: str) -> str:
+        nonlocal line
+        try:
+            line, value = next(numbered)
+        except StopIteration:
+            raise EOFError("Неожиданный конец ввода") from None
+        return value
+
+    # Накопленные работники с номерами строк, на которых записан год.
+    pending: List[tuple[int, tuple[str, str, int]]] = []
+    errors = 0
+    for line, text in numbered:
+        command = text.strip().lower()
+        if not command:
+            continue
+        try:
+            if command == "add":
+                item = (read(""), read(""), int(read("")))
+                pending.append((line, item))
+                continue
+            errors += add_batch(staff, pending)
+            pending = []
+            if command == "exit":
+                break
+            execute(staff, command, read)
+        except Exception as exc:
+            report(exc, line)
+            errors += 1
+    return errors + add_batch(staff, pending)
+
+
+def main(command_line: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser("workers")
+    parser.add_argument(
+        "--async-log",
+        action="store_true",
+        help="Write the log from a background thread in batches",
+    )
+    parser.add_argument(
+        "-b",
+        "--batch",
+        metavar="FILE",
+        help="Execute commands from a file ('-' for stdin) without prompts",
+    )
+    args = parser.parse_args(command_line)
+    # Выполнить настройку логгера. В пакетном режиме журнал всегда
+    # пишется фоновым потоком и сбрасывается на диск пакетами.
+    configure_logging("workers.log", use_queue=args.async_log or bool(args.batch))
     # Список работников.
     staff = Staff()
+    if args.batch:
+        if args.batch == "-":
+            errors = run_batch(staff, sys.stdin)
+        else:
+            with open(args.batch, "r", encoding="utf8") as fin:
+                errors = run_batch(staff, fin)
+        if errors:
+            sys.exit(1)
+        return
+
     # Организовать бесконечный цикл запроса команд.
     while True:
         try:
             # Запросить команду из терминала.
             command = input(">>> ").lower()
+        except EOFError:
+            break
+        try:
             # Выполнить действие в соответствие с командой.
             if command == "exit":
                 break
-            elif command == "add":
-                # Запросить данные о работнике.
-                name = input("Фамилия и инициалы? ")
-                post = input("Должность? ")
-                year = int(input("Год поступления? "))
-                # Добавить работника.
-                staff.add(name, post, year)
-                logging.info(
-                    f"Добавлен сотрудник: {name}, {post}, "
-                    f"поступивший в {year} году."
-                )
-            elif command == "list":
-                # Вывести список.
-                print(staff)
-                logging.info("Отображен список сотрудников.")
-            elif command.startswith("select "):
-                # Разбить команду на части для выделения номера года.
-                parts = command.split(maxsplit=1)
-                # Запросить работников.
-                selected = staff.select(int(parts[1]))
-                # Вывести результаты запроса.
-                if selected:
-                    for idx, worker in enumerate(selected, 1):
-                        print("{:>4}: {}".format(idx, worker.name))
-                    logging.info(
-                        f"Найдено {len(selected)} работников со "
-                        f"стажем более {parts[1]} лет."
-                    )
-                else:
-                    print("Работники с заданным стажем не найдены.")
-                    logging.warning(
-                        f"Работники со стажем более {parts[1]} лет не найдены."
-                    )
-            elif command.startswith("load "):
-                # Разбить команду на части для имени файла.
-                parts = command.split(maxsplit=1)
-                # Загрузить данные из файла.
-                filename = "XML/" + parts[1]
-                staff.load(filename)
-                logging.info(f"Загружены данные из файла {filename}.")
-            elif command.startswith("save "):
-                # Разбить команду на части для имени файла.
-                parts = command.split(maxsplit=1)
-                # Сохранить данные в файл.
-                filename = "XML/" + parts[1]
-                staff.save(filename)
-                logging.info(f"Сохранены данные в файл {filename}.")
-            elif command == "help":
-                # Вывести справку о работе с программой.
-                print("Список команд:\n")
-                print("add - добавить работника;")
-
-                print("list - вывести список работников;")
-                print("select <стаж> - запросить работников со стажем;")
-                print("load <имя_файла> - загрузить данные из файла;")
-                print("save <имя_файла> - сохранить данные в файл;")
-                print("help - отобразить справку;")
-                print("exit - завершить работу с программой.")
-            else:
-                raise UnknownCommandError(command)
+            execute(staff, command, input)
         except Exception as exc:
-            logging.error(f"Ошибка: {exc}")
-            print(exc, file=sys.stderr)
+            report(exc)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Граф маршрутов: пункты - вершины, маршруты - направленные ребра от
+# пункта отправления к пункту прибытия, помеченные номером маршрута.
+# Позволяет искать путь между пунктами с наименьшим числом пересадок
+# и множество достижимых пунктов. Модуль импортируется программой
+# маршрутов только для запросов к графу.
+
+from collections import deque
+from typing import TYPE_CHECKING, Iterable, List
+
+if TYPE_CHECKING:
+    from ind_1 import Route
+
+# Состояние поиска: пункт и номер маршрута, которым едет пассажир
+# (None, если пассажир находится в пункте вне маршрута).
+State = tuple[str, int | None]
+
+
+class RouteGraph:
+    """
+    Индекс смежности маршрутов: пункт отправления -> номер маршрута ->
+    маршруты с этим номером из пункта. Пополняется при добавлении
+    маршрутов без перестроения.
+    """
+
+    def __init__(self, routes: Iterable["Route"] = ()) -> None:
+        self.edges: dict[str, dict[int, List["Route"]]] = {}
+        self.size = 0
+        for route in routes:
+            self.add(route)
+
+    def add(self, route: "Route") -> None:
+        """
+        Добавить маршрут в граф.
+        """
+        lines = self.edges.setdefault(route.start, {})
+        lines.setdefault(route.number, []).append(route)
+        self.size += 1
+
+    def __len__(self) -> int:
+        return self.size
+
+    def reachable(self, start: str) -> set[str]:
+        """
+        Найти пункты, в которые можно попасть из заданного пункта по
+        одному или нескольким маршрутам.
+        """
+        seen: set[str] = set()
+        queue = deque([start.lower()])
+        while queue:
+            point = queue.popleft()
+            for routes in self.edges.get(point, {}).values():
+                for route in routes:
+                    if route.end not in seen:
+                        seen.add(route.end)
+                        queue.append(route.end)
+        return seen
+
+    def path(self, start: str, end: str) -> List["Route"] | None:
+        """
+        Найти путь из пункта start в пункт end с наименьшим числом
+        пересадок, то есть смен номера маршрута. Возвращает маршруты пути
+        по порядку (пустой список, если пункты совпадают) или None, если
+        пункт end недостижим.
+        """
+        start, end = start.lower(), end.lower()
+        if start == end:
+            return []
+
+        # Поиск в ширину с ребрами веса 0 и 1 по состояниям: (пункт, None) -
+        # пассажир в пункте, (пункт, номер) - едет маршрутом с этим номером.
+        # Посадка стоит 1, поездка тем же маршрутом и выход - 0. Состояния
+        # извлекаются из очереди в порядке неубывания числа посадок,
+        # поэтому первое извлеченное состояние (end, None) дает
+        # оптимальный путь, а посадки из каждого пункта перебираются
+        # только один раз.
+        initial: State = (start, None)
+        boardings: dict[State, int] = {initial: 0}
+        previous: dict[State, tuple[State, "Route | None"]] = {}
+        queue: deque[tuple[int, State]] = deque([(0, initial)])
+
+        def relax(
+            state: State, cost: int, source: State, route: "Route | None"
+        ) -> bool:
+            if cost < boardings.get(state, cost + 1):
+                boardings[state] = cost
+                previous[state] = (source, route)
+                return True
+            return False
+
+        while queue:
+            cost, state = queue.popleft()
+            if cost > boardings[state]:
+                continue
+            point, number = state
+            lines = self.edges.get(point, {})
+            if number is None:
+                if point == end:
+                    return self._legs(state, initial, previous)
+                for line in lines:
+                    target: State = (point, line)
+                    if relax(target, cost + 1, state, None):
+                        queue.append((cost + 1, target))
+                continue
+            for route in lines.get(number, ()):
+                target = (route.end, number)
+                if relax(target, cost, state, route):
+                    queue.appendleft((cost, target))
+            target = (point, None)
+            if relax(target, cost, state, None):
+                queue.appendleft((cost, target))
+        return None
+
+    @staticmethod
+    def _legs(
+        state: State,
+        initial: State,
+        previous: dict[State, tuple[State, "Route | None"]],
+    ) -> List["Route"]:
+        legs = []
+        while state != initial:
+            state, route = previous[state]
+            if route is not None:
+                legs.append(route)
+        return legs[::-1]
+
+
+def count_transfers(legs: Iterable["Route"]) -> int:
+    """
+    Получить число пересадок на пути.
+    """
+    numbers = [route.number for route in legs]
+    return sum(1 for a, b in zip(numbers, numbers[1:]) if a != b)
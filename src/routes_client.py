@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Тонкий клиент сервера программы маршрутов. Модуль не зависит от
+# модулей сервера и самой программы маршрутов. При запуске принимает те
+# же аргументы, что и программа маршрутов: команда с параметром --socket
+# отправляется серверу без загрузки модуля маршрутов, остальные команды
+# выполняются программой маршрутов.
+
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+
+def socket_command(argv: list[str]) -> tuple[str | None, list[str]]:
+    """
+    Получить путь к сокету сервера из параметра --socket и команду для
+    сервера без этого параметра. Если команды нет или это команда serve,
+    путь не возвращается: такие аргументы разбираются самой программой.
+    """
+    socket_path: str | None = None
+    command: list[str] = []
+    args = iter(argv)
+    for arg in args:
+        if arg == "--socket":
+            socket_path = next(args, None)
+        elif arg.startswith("--socket="):
+            socket_path = arg.removeprefix("--socket=")
+        else:
+            command.append(arg)
+    name = next((arg for arg in command if not arg.startswith("-")), None)
+    if name is None or name == "serve":
+        return None, command
+    return socket_path, command
+
+
+def send_command(socket_path: Path, argv: list[str]) -> dict[str, Any]:
+    """
+    Отправить команду серверу и получить ответ.
+    """
+    import socket
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(socket_path))
+        request = {"argv": argv, "cwd": os.getcwd()}
+        sock.sendall(json.dumps(request, ensure_ascii=False).encode() + b"\n")
+        with sock.makefile("rb") as reader:
+            response: dict[str, Any] = json.loads(reader.readline())
+    return response
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Выполнить команду программы маршрутов и вернуть код завершения.
+    Команда с параметром --socket выполняется сервером.
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    socket_path, command = socket_command(argv)
+    if socket_path is None:
+        import ind_1
+
+        try:
+            ind_1.main(argv)
+        except Exception as exc:
+            print(ind_1.report_error(exc), file=sys.stderr)
+            return 1
+        return 0
+
+    response = send_command(Path(socket_path), command)
+    sys.stdout.write(response["stdout"])
+    if response["stderr"]:
+        print(response["stderr"], file=sys.stderr)
+    status: int = response["status"]
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Сервер, выполняющий команды программы маршрутов через Unix-сокет.
+# Загруженные наборы данных остаются в памяти сервера между запросами.
+# Модуль импортируется программой только для команды serve, клиент
+# находится в модуле routes_client.
+
+import contextlib
+import io
+import json
+import logging
+import signal
+import socketserver
+import sys
+from pathlib import Path
+from typing import Any, Callable
+
+# Функция выполнения команды: аргументы командной строки и словарь
+# загруженных наборов данных, который сохраняется между запросами.
+Command = Callable[[list[str], dict[Any, Any]], None]
+# Функция, записывающая ошибку в журнал и возвращающая сообщение о ней.
+ErrorReporter = Callable[[Exception], str]
+
+
+class CommandServer(socketserver.UnixStreamServer):
+    """
+    Сервер, выполняющий команды над наборами данных, которые остаются
+    загруженными в памяти между запросами.
+    """
+
+    def __init__(
+        self, socket_path: Path, command: Command, report_error: ErrorReporter
+    ) -> None:
+        self.command = command
+        self.report_error = report_error
+        self.datasets: dict[Any, Any] = {}
+        super().__init__(str(socket_path), CommandRequestHandler)
+
+    def execute(self, argv: list[str], cwd: str) -> dict[str, Any]:
+        """
+        Выполнить команду и вернуть код завершения и перехваченный вывод.
+        """
+        out = io.StringIO()
+        status, error = 0, ""
+        with contextlib.chdir(cwd), contextlib.redirect_stdout(out):
+            try:
+                self.command(argv, self.datasets)
+            except SystemExit as exc:
+                status = exc.code if isinstance(exc.code, int) else 0
+            except Exception as exc:
+                status, error = 1, self.report_error(exc)
+        return {"status": status, "stdout": out.getvalue(), "stderr": error}
+
+
+class CommandRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Обработчик соединения: каждая строка запроса - объект JSON с
+    аргументами командной строки и рабочим каталогом клиента, на каждую
+    строку отправляется строка ответа в формате JSON.
+    """
+
+    server: CommandServer
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            request = json.loads(line)
+            response = self.server.execute(request["argv"], request["cwd"])
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+            self.wfile.flush()
+
+
+def serve(socket_path: Path, command: Command, report_error: ErrorReporter) -> None:
+    """
+    Запустить сервер на заданном сокете до его остановки.
+    """
+    socket_path.unlink(missing_ok=True)
+    with CommandServer(socket_path, command, report_error) as server:
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        logging.info(f"Сервер запущен на сокете {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            socket_path.unlink(missing_ok=True)
+            logging.info(f"Сервер на сокете {socket_path} остановлен")
@@ -7,19 +7,157 @@
 # а также диапазон целых чисел.
 # Произведите обработку ошибок ввода пользователя.
 
+import csv
+import functools
+import itertools
+import mmap
+import os
 import random
-from typing import Generator
+import struct
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Generator, Iterator, Sequence, TextIO, overload
+
+from fileio import atomic_write
+
+# Пакет numpy необязателен и импортируется только для способа генерации
+# "numpy".
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
+
+# Способы генерации матрицы.
+ENGINES = ("python", "numpy")
+
+# Целочисленные типы numpy в порядке возрастания размера и
+# соответствующие им коды типов модуля array.
+UNSIGNED_DTYPES = ("uint8", "uint16", "uint32", "uint64")
+SIGNED_DTYPES = ("int8", "int16", "int32", "int64")
+TYPECODES = {
+    "uint8": "B",
+    "uint16": "H",
+    "uint32": "I",
+    "uint64": "Q",
+    "int8": "b",
+    "int16": "h",
+    "int32": "i",
+    "int64": "q",
+}
+
+# Число строк в блоке генерации. Каждый блок генерируется своим
+# генератором со своим зерном, поэтому блоки можно генерировать
+# независимо в разных процессах.
+CHUNK_ROWS = 1024
+
+
+# Файл матрицы: заголовок (сигнатура, версия, номер способа генерации,
+# код типа array, порядок байтов, число строк и столбцов, диапазон и
+# зерно) и значения элементов по строкам в порядке байтов платформы.
+MATRIX_MAGIC = b"MTX1"
+MATRIX_VERSION = 1
+MATRIX_HEADER = struct.Struct("<4sHBcc7xQQqqQ")
+BYTEORDER = b"<" if sys.byteorder == "little" else b">"
+
+# Расширение файла матрицы в формате CSV.
+CSV_SUFFIX = ".csv"
+
+
+def format_row(row: list[int]) -> str:
+    """
+    Получить строку матрицы в текстовом виде.
+    """
+    return "|\t" + "\t".join(map(str, row)) + "\t|\n"
+
+
+def select_dtype(start: int, end: int) -> str:
+    """
+    Выбрать наименьший целочисленный тип numpy, вмещающий диапазон.
+    """
+    names = SIGNED_DTYPES if start < 0 else UNSIGNED_DTYPES
+    for bits, name in zip((8, 16, 32, 64), names):
+        if start < 0:
+            low, high = -(2 ** (bits - 1)), 2 ** (bits - 1) - 1
+        else:
+            low, high = 0, 2**bits - 1
+        if low <= start and end <= high:
+            return name
+    raise OverflowError(f"Диапазон [{start}, {end}] не помещается в тип numpy")
 
 
 class Matrix:
-    def __init__(self, rows: int, columns: int, start: int, end: int) -> None:
+    def __init__(
+        self,
+        rows: int,
+        columns: int,
+        start: int,
+        end: int,
+        engine: str = "python",
+        seed: int | None = None,
+    ) -> None:
+        if engine not in ENGINES:
+            raise UnknownEngineError(engine)
         self.rows = rows
         self.columns = columns
         self.start = start
         self.end = end
-        self.matrix: list[list[int]] = []
+        self.engine = engine
+        self.seed = seed
+        # Матрица, сгенерированная numpy; список списков строится из неё
+        # только при обращении к атрибуту matrix и после этого заменяет её.
+        self.array: "NDArray[Any] | None" = None
+        self._matrix: list[list[int]] = []
+        # Зерно, с которым матрица была сгенерирована в последний раз.
+        self.generated_seed: int | None = None
+        # Матрица в файле, отображенном в память.
+        self.file: MatrixFile | None = None
+
+    @classmethod
+    def open(cls, file_path: Path) -> "Matrix":
+        """
+        Открыть матрицу, ранее сгенерированную в файл, без повторной
+        генерации.
+        """
+        file = MatrixFile(file_path)
+        matrix = cls(
+            file.rows, file.columns, file.start, file.end, file.engine, file.seed
+        )
+        matrix.generated_seed = file.seed
+        matrix.file = file
+        return matrix
+
+    def __enter__(self) -> "Matrix":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.file is not None:
+            try:
+                self.file.close()
+            finally:
+                self.file = None
+
+    @property
+    def matrix(self) -> list[list[int]]:
+        # Построенный список списков заменяет массив numpy и файл, чтобы
+        # его изменения учитывались при выводе и сохранении матрицы.
+        if not self._matrix and self.array is not None:
+            self.matrix = self.array.tolist()
+        elif not self._matrix and self.file is not None:
+            self.matrix = list(self.file)
+        return self._matrix
+
+    @matrix.setter
+    def matrix(self, value: list[list[int]]) -> None:
+        self.close()
+        self._matrix = value
+        self.array = None
 
-    def generate_matrix(self) -> None:
+    def _validate(self) -> None:
         for name, value in self.items():
             if value <= 0:
                 raise NumberNotPositiveError(name, value)
@@ -27,22 +165,467 @@ class Matrix:
         if self.start > self.end:
             raise StartGreaterThanEndError(self.start, self.end)
 
-        self.matrix = [
-            [random.randint(self.start, self.end) for _ in range(self.columns)]
-            for _ in range(self.rows)
-        ]
+    def generate_matrix(self, workers: int = 1, file_path: Path | None = None) -> None:
+        """
+        Сгенерировать матрицу. При workers > 1 блоки строк генерируются
+        параллельно в пуле процессов и записываются в общую память; с
+        одним и тем же зерном результат не зависит от числа процессов.
+        С file_path матрица генерируется в файл и отображается в память.
+        """
+        self._validate()
+        seed = self._next_seed()
+        if file_path is not None:
+            file = MatrixFile.create(file_path, self.task(seed), workers)
+            self.matrix = []
+            self.file = file
+        elif workers > 1:
+            self._generate_parallel(seed, workers)
+        elif self.engine == "numpy":
+            import numpy as np
+
+            values = np.empty(
+                (self.rows, self.columns), dtype=select_dtype(self.start, self.end)
+            )
+            for index in range(self.blocks()):
+                first, last = self.block_range(index)
+                values[first:last] = generate_block(self.task(seed), index)
+            self.matrix = []
+            self.array = values
+        else:
+            self.matrix = list(self._generate_rows(seed))
+
+    def _generate_parallel(self, seed: int, workers: int) -> None:
+        dtype = select_dtype(self.start, self.end)
+        typecode = TYPECODES[dtype]
+        size = self.rows * self.columns * array(typecode).itemsize
+        shm = SharedMemory(create=True, size=size)
+        try:
+            fill = functools.partial(fill_shared, shm.name, typecode, self.task(seed))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for _ in pool.map(fill, range(self.blocks())):
+                    pass
+            if self.engine == "numpy":
+                import numpy as np
+
+                shape = (self.rows, self.columns)
+                shared = np.ndarray(shape, dtype=dtype, buffer=shared_buffer(shm))
+                self.matrix = []
+                self.array = shared.copy()
+                del shared
+            else:
+                cells = array(typecode)
+                cells.frombytes(shared_buffer(shm)[:size])
+                rows = []
+                for first in range(0, len(cells), self.columns):
+                    last = first + self.columns
+                    rows.append(cells[first:last].tolist())
+                self.matrix = rows
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def _next_seed(self) -> int:
+        """
+        Получить зерно для очередной генерации. Без заданного зерна оно
+        берется из общего состояния модуля random и сохраняется в атрибуте
+        generated_seed, чтобы матрицу можно было воспроизвести.
+        """
+        seed = self.seed if self.seed is not None else random.getrandbits(64)
+        self.generated_seed = seed
+        return seed
+
+    def task(self, seed: int) -> "BlockTask":
+        return BlockTask(
+            self.engine, seed, self.rows, self.columns, self.start, self.end
+        )
+
+    def blocks(self) -> int:
+        return -(-self.rows // CHUNK_ROWS)
+
+    def block_range(self, index: int) -> tuple[int, int]:
+        first = index * CHUNK_ROWS
+        return first, min(first + CHUNK_ROWS, self.rows)
+
+    def _generate_rows(
+        self, seed: int | None = None
+    ) -> Generator[list[int], None, None]:
+        """
+        Генерировать строки матрицы по мере запроса, не сохраняя их.
+        """
+        self._validate()
+        task = self.task(self._next_seed() if seed is None else seed)
+        for index in range(self.blocks()):
+            block = generate_block(task, index)
+            yield from block if isinstance(block, list) else block.tolist()
+
+    def is_generated(self) -> bool:
+        return self.array is not None or self.file is not None or bool(self._matrix)
+
+    def iter_rows(self) -> Generator[list[int], None, None]:
+        """
+        Перебрать строки матрицы. Если матрица еще не сгенерирована, строки
+        генерируются по мере перебора и не сохраняются.
+        """
+        if self.array is not None:
+            for row in self.array:
+                yield row.tolist()
+        elif self.file is not None:
+            yield from self.file
+        elif self._matrix:
+            yield from self._matrix
+        else:
+            yield from self._generate_rows()
+
+    def iter_chunks(
+        self, chunk_rows: int = CHUNK_ROWS
+    ) -> Generator[list[list[int]], None, None]:
+        """
+        Перебрать строки матрицы блоками по chunk_rows строк.
+        """
+        chunk: list[list[int]] = []
+        for row in self.iter_rows():
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def write(self, file: TextIO, chunk_rows: int = CHUNK_ROWS) -> None:
+        """
+        Записать матрицу в текстовый файл блоками строк.
+        """
+        for chunk in self.iter_chunks(chunk_rows):
+            file.write("".join(map(format_row, chunk)))
+
+    def save(self, file_path: Path) -> None:
+        """
+        Сохранить матрицу в файл CSV или, если файл имеет другое
+        расширение, в двоичный файл матрицы. Матрица записывается блоками
+        строк; несгенерированная матрица генерируется при сохранении, не
+        сохраняясь в памяти.
+        """
+        if file_path.suffix == CSV_SUFFIX:
+            with atomic_write(file_path, "w", encoding="utf-8", newline="") as file_out:
+                writer = csv.writer(file_out)
+                for chunk in self.iter_chunks():
+                    writer.writerows(chunk)
+            return
+
+        if not self.is_generated():
+            MatrixFile.create(file_path, self.task(self._next_seed())).close()
+            return
+        # Значения матрицы, заданной или измененной вручную, могут выйти
+        # за диапазон генерации: тип и диапазон в заголовке выбираются
+        # так, чтобы вместить и диапазон, и фактические значения.
+        low, high = self._value_range()
+        start, end = min(self.start, low), max(self.end, high)
+        typecode = TYPECODES[select_dtype(start, end)]
+        # Для матрицы, заданной вручную, зерно в заголовке равно нулю.
+        task = BlockTask(
+            self.engine, self.generated_seed or 0, self.rows, self.columns, start, end
+        )
+        with atomic_write(file_path, "wb") as file_out:
+            file_out.write(pack_header(task, typecode))
+            if self.array is not None:
+                for first in range(0, self.rows, CHUNK_ROWS):
+                    last = first + CHUNK_ROWS
+                    block = self.array[first:last]
+                    file_out.write(block.astype(typecode, copy=False).tobytes())
+                return
+            for chunk in self.iter_chunks():
+                cells = itertools.chain.from_iterable(chunk)
+                file_out.write(array(typecode, cells).tobytes())
+
+    def _value_range(self) -> tuple[int, int]:
+        """
+        Получить наименьшее и наибольшее значения сгенерированной матрицы.
+        """
+        if self.array is not None:
+            return int(self.array.min()), int(self.array.max())
+        if self.file is not None:
+            # Значения в файле не выходят за диапазон из его заголовка.
+            return self.file.start, self.file.end
+        rows = [row for row in self._matrix if row]
+        if not rows:
+            return self.start, self.end
+        return min(map(min, rows)), max(map(max, rows))
+
+    @classmethod
+    def load(cls, file_path: Path) -> "Matrix":
+        """
+        Загрузить матрицу из файла CSV или двоичного файла матрицы.
+        Двоичный файл отображается в память без копирования данных.
+        """
+        if file_path.suffix != CSV_SUFFIX:
+            return cls.open(file_path)
+
+        with file_path.open("r", encoding="utf-8", newline="") as file_in:
+            rows = [list(map(int, row)) for row in csv.reader(file_in)]
+        if not rows or not rows[0]:
+            raise ValueError(f"{file_path}: файл не содержит матрицы")
+        columns = len(rows[0])
+        if any(len(row) != columns for row in rows):
+            raise ValueError(f"{file_path}: строки матрицы разной длины")
+
+        matrix = cls(
+            len(rows),
+            columns,
+            min(map(min, rows)),
+            max(map(max, rows)),
+        )
+        matrix.matrix = rows
+        return matrix
 
     def items(self) -> Generator[tuple[str, int], None, None]:
         for name in ["rows", "columns"]:
             yield name, getattr(self, name)
 
     def __str__(self) -> str:
-        if not self.matrix:
+        if not self.is_generated():
             return "Матрица пока не сгенерирована"
-        string = ""
-        for row in self.matrix:
-            string += "|\t" + "\t".join(map(str, row)) + "\t|\n"
-        return string
+        return "".join(map(format_row, self.iter_rows()))
+
+
+@dataclass(frozen=True)
+class BlockTask:
+    """
+    Параметры генерации матрицы, передаваемые процессам пула.
+    """
+
+    engine: str
+    seed: int
+    rows: int
+    columns: int
+    start: int
+    end: int
+
+
+def generate_block(task: BlockTask, index: int) -> "list[list[int]] | NDArray[Any]":
+    """
+    Сгенерировать блок строк с заданным номером. Зерно блока выводится из
+    общего зерна и номера блока, поэтому блок не зависит от остальных.
+    """
+    first = index * CHUNK_ROWS
+    rows = min(CHUNK_ROWS, task.rows - first)
+    if task.engine == "numpy":
+        import numpy as np
+
+        rng = np.random.default_rng(
+            np.random.SeedSequence(task.seed, spawn_key=(index,))
+        )
+        return rng.integers(
+            task.start,
+            task.end,
+            size=(rows, task.columns),
+            dtype=select_dtype(task.start, task.end),
+            endpoint=True,
+        )
+    randint = random.Random(f"{task.seed}:{index}").randint
+    return [
+        [randint(task.start, task.end) for _ in range(task.columns)]
+        for _ in range(rows)
+    ]
+
+
+def shared_buffer(shm: SharedMemory) -> memoryview:
+    buffer = shm.buf
+    assert buffer is not None, "общая память уже закрыта"
+    return buffer
+
+
+def block_bytes(task: BlockTask, typecode: str, index: int) -> tuple[int, bytes]:
+    """
+    Сгенерировать блок строк и получить его смещение от начала данных
+    матрицы и содержимое в порядке байтов платформы.
+    """
+    block = generate_block(task, index)
+    if isinstance(block, list):
+        data = array(typecode, itertools.chain.from_iterable(block)).tobytes()
+    else:
+        data = block.tobytes()
+    return index * CHUNK_ROWS * task.columns * array(typecode).itemsize, data
+
+
+def fill_shared(name: str, typecode: str, task: BlockTask, index: int) -> None:
+    """
+    Сгенерировать блок строк и записать его в общую память процессов.
+    """
+    offset, data = block_bytes(task, typecode, index)
+    end = offset + len(data)
+    shm = SharedMemory(name=name)
+    try:
+        shared_buffer(shm)[offset:end] = data
+    finally:
+        shm.close()
+
+
+def fill_file(file_path: Path, typecode: str, task: BlockTask, index: int) -> None:
+    """
+    Сгенерировать блок строк и записать его на свое место в файле матрицы.
+    """
+    offset, data = block_bytes(task, typecode, index)
+    fd = os.open(file_path, os.O_WRONLY)
+    try:
+        os.pwrite(fd, data, MATRIX_HEADER.size + offset)
+    finally:
+        os.close(fd)
+
+
+def pack_header(task: BlockTask, typecode: str) -> bytes:
+    """
+    Получить заголовок файла матрицы.
+    """
+    if not 0 <= task.seed < 2**64:
+        raise OverflowError(f"Зерно {task.seed} не помещается в заголовок")
+    if task.start < -(2**63) or task.end >= 2**63:
+        raise OverflowError(
+            f"Диапазон [{task.start}, {task.end}] не помещается в заголовок"
+        )
+    return MATRIX_HEADER.pack(
+        MATRIX_MAGIC,
+        MATRIX_VERSION,
+        ENGINES.index(task.engine),
+        typecode.encode("ascii"),
+        BYTEORDER,
+        task.rows,
+        task.columns,
+        task.start,
+        task.end,
+        task.seed,
+    )
+
+
+class MatrixFile(Sequence[list[int]]):
+    """
+    Матрица в файле, отображенном в память. Строки читаются из файла
+    только при обращении к ним.
+    """
+
+    def __init__(self, file_path: Path) -> None:
+        self.file_path = file_path
+        with file_path.open("rb") as file_in:
+            self._mm = mmap.mmap(file_in.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._read_header()
+        except BaseException:
+            self._mm.close()
+            raise
+
+    def _read_header(self) -> None:
+        error = ValueError(f"{self.file_path}: неизвестный формат файла матрицы")
+        if len(self._mm) < MATRIX_HEADER.size:
+            raise error
+        fields = MATRIX_HEADER.unpack_from(self._mm)
+        magic, version, engine, typecode, byteorder, *params = fields
+        self.typecode: str = typecode.decode("ascii", "replace")
+        if (
+            magic != MATRIX_MAGIC
+            or version != MATRIX_VERSION
+            or byteorder != BYTEORDER
+            or engine >= len(ENGINES)
+            or self.typecode not in TYPECODES.values()
+        ):
+            raise error
+
+        self.engine = ENGINES[engine]
+        self.rows: int
+        self.columns: int
+        self.start: int
+        self.end: int
+        self.seed: int
+        self.rows, self.columns, self.start, self.end, self.seed = params
+        size = self.rows * self.columns * array(self.typecode).itemsize
+        begin, end = MATRIX_HEADER.size, MATRIX_HEADER.size + size
+        if len(self._mm) < end:
+            raise ValueError(f"{self.file_path}: файл матрицы обрезан")
+        self._cells = memoryview(self._mm)[begin:end].cast(self.typecode)
+
+    @classmethod
+    def create(cls, file_path: Path, task: BlockTask, workers: int = 1) -> "MatrixFile":
+        """
+        Сгенерировать матрицу в файл блок за блоком и открыть его. Блоки
+        записываются на свои места в файле, в том числе процессами пула,
+        поэтому матрица целиком в памяти не находится.
+        """
+        typecode = TYPECODES[select_dtype(task.start, task.end)]
+        size = task.rows * task.columns * array(typecode).itemsize
+        header = pack_header(task, typecode)
+
+        # Блоки записываются во временный файл, который заменяет прежний,
+        # только когда все блоки записаны.
+        with atomic_write(file_path, "wb") as file_out:
+            file_out.write(header)
+            file_out.truncate(MATRIX_HEADER.size + size)
+            file_out.flush()
+            fill = functools.partial(fill_file, Path(file_out.name), typecode, task)
+            blocks = range(-(-task.rows // CHUNK_ROWS))
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    for _ in pool.map(fill, blocks):
+                        pass
+            else:
+                for index in blocks:
+                    fill(index)
+        return cls(file_path)
+
+    def __enter__(self) -> "MatrixFile":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Закрыть отображение файла. Пока живы массивы, полученные методом
+        as_array, отображение закрыть нельзя: тогда оно освобождается
+        сборщиком мусора вместе с последним таким массивом.
+        """
+        try:
+            self._cells.release()
+            self._mm.close()
+        except BufferError:
+            pass
+
+    def as_array(self) -> "NDArray[Any]":
+        """
+        Получить матрицу как массив numpy, использующий память отображения
+        файла без копирования. Массив остается действительным и после
+        закрытия файла.
+        """
+        import numpy as np
+
+        return np.frombuffer(self._cells, dtype=self.typecode).reshape(
+            self.rows, self.columns
+        )
+
+    def __len__(self) -> int:
+        return self.rows
+
+    @overload
+    def __getitem__(self, index: int) -> list[int]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[list[int]]: ...
+
+    def __getitem__(self, index: int | slice) -> list[int] | list[list[int]]:
+        if isinstance(index, slice):
+            return [self._row(idx) for idx in range(*index.indices(self.rows))]
+        if index < 0:
+            index += self.rows
+        if not 0 <= index < self.rows:
+            raise IndexError("index out of range")
+        return self._row(index)
+
+    def _row(self, index: int) -> list[int]:
+        first = index * self.columns
+        last = first + self.columns
+        return self._cells[first:last].tolist()
+
+    def __iter__(self) -> Iterator[list[int]]:
+        for index in range(self.rows):
+            yield self._row(index)
 
 
 class StartGreaterThanEndError(Exception):
@@ -61,6 +644,20 @@ class StartGreaterThanEndError(Exception):
         return f"{self.message}: {self.start} > {self.end}"
 
 
+class UnknownEngineError(Exception):
+    def __init__(
+        self,
+        engine: str,
+        message: str = "Неизвестный способ генерации матрицы",
+    ) -> None:
+        self.engine = engine
+        self.message = message
+        super(UnknownEngineError, self).__init__(message)
+
+    def __str__(self) -> str:
+        return f"{self.message}: {self.engine} (ожидалось {', '.join(ENGINES)})"
+
+
 class NumberNotPositiveError(Exception):
     def __init__(
         self,
@@ -85,8 +682,9 @@ def main() -> None:
             int(input("Введите начало диапазона: ")),
             int(input("Введите конец диапазона: ")),
         )
-        matrix.generate_matrix()
-        print(matrix)
+        # Строки генерируются и выводятся блоками, не сохраняясь в памяти.
+        matrix.write(sys.stdout)
+        print()
 
     except Exception as e:
         print("Ошибка: ", e)
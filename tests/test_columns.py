@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from dataclasses import dataclass
+
+import pytest
+
+from columns import STR, Columns, StringTable
+
+
+@dataclass(frozen=True, slots=True)
+class Record:
+    name: str
+    value: int
+
+
+def make_columns(*items: Record) -> Columns[Record]:
+    return Columns(Record, (("name", STR), ("value", "i")), items)
+
+
+def test_string_table() -> None:
+    table = StringTable()
+    assert table.intern("a") == 0
+    assert table.intern("b") == 1
+    assert table.intern("a") == 0
+    assert len(table) == 2
+    assert table[1] == "b"
+
+
+def test_columns() -> None:
+    columns = make_columns(Record("a", 1), Record("b", 2))
+    assert len(columns) == 2
+    assert columns[0] == Record("a", 1)
+    assert columns[-1] == Record("b", 2)
+    assert columns[:1] == [Record("a", 1)]
+    assert columns == [Record("a", 1), Record("b", 2)]
+    assert [Record("a", 1), Record("b", 2)] == columns
+
+    columns.insert(1, Record("a", 3))
+    columns.append(Record("c", 4))
+    assert list(columns) == [
+        Record("a", 1),
+        Record("a", 3),
+        Record("b", 2),
+        Record("c", 4),
+    ]
+    assert len(columns.table) == 3
+
+    columns[0] = Record("d", 5)
+    del columns[1]
+    assert list(columns) == [Record("d", 5), Record("b", 2), Record("c", 4)]
+
+    columns[:] = sorted(columns, key=lambda record: record.value)
+    assert [record.value for record in columns] == [2, 4, 5]
+
+    columns.extend(columns)
+    assert len(columns) == 6
+
+    columns.clear()
+    assert len(columns) == 0
+    assert len(columns.table) == 0
+
+    with pytest.raises(IndexError):
+        columns[0]
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import fcntl
+import os
+from pathlib import Path
+
+import pytest
+
+from fileio import atomic_write, file_lock, increment_counter, read_counter
+
+
+def test_atomic_write(tmp_path: Path) -> None:
+    file_path = tmp_path / "data.txt"
+    file_path.write_text("old")
+
+    with pytest.raises(RuntimeError):
+        with atomic_write(file_path) as file_out:
+            file_out.write("new")
+            raise RuntimeError()
+
+    assert file_path.read_text() == "old"
+    assert os.listdir(tmp_path) == ["data.txt"]
+
+    with atomic_write(file_path) as file_out:
+        file_out.write("new")
+    assert file_path.read_text() == "new"
+
+
+def test_file_lock(tmp_path: Path) -> None:
+    lock_path = tmp_path / "data.lock"
+    with file_lock(lock_path):
+        assert lock_path.exists()
+        # Исключительную блокировку не может захватить другой файловый
+        # дескриптор, даже в том же процессе.
+        with lock_path.open() as other:
+            with pytest.raises(BlockingIOError):
+                fcntl.flock(other.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    with file_lock(lock_path, shared=True), lock_path.open() as other:
+        fcntl.flock(other.fileno(), fcntl.LOCK_SH | fcntl.LOCK_NB)
+        with pytest.raises(BlockingIOError):
+            fcntl.flock(other.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+def test_counter(tmp_path: Path) -> None:
+    counter_path = tmp_path / "data.lock"
+    assert read_counter(counter_path) == 0
+    # Пустой файл блокировки содержит нулевой счетчик.
+    with file_lock(counter_path):
+        assert read_counter(counter_path) == 0
+        assert increment_counter(counter_path) == 1
+    inode = counter_path.stat().st_ino
+    assert increment_counter(counter_path) == 2
+    assert read_counter(counter_path) == 2
+    assert counter_path.stat().st_ino == inode
@@ -2,23 +2,61 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import io
+import json
+import multiprocessing
 import os
+import shutil
+import subprocess
+import sys
 from pathlib import Path
 from typing import Any
 
 import pytest
-from jsonschema import ValidationError
+from jsonschema import ValidationError, validate
 
+from fileio import file_lock
 from ind_1 import (
+    ROUTES_SCHEMA,
+    ConcurrentUpdateError,
     CustomArgumentParser,
     FileNotExistsError,
     Route,
+    RouteColumns,
     RouteExistsError,
+    RouteFile,
     Routes,
+    ServerError,
+    add_route,
+    file_stat,
+    file_version,
+    iter_json_array,
+    journal_path,
+    lock_path,
     main,
+    report_error,
+    save_route,
+    validate_route,
+    validate_routes,
 )
 
 
+def test_lazy_imports() -> None:
+    code = (
+        "import sys, ind_1; "
+        "print(sorted({'jsonschema', 'socketserver', 'concurrent.futures'} "
+        "& set(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd="src",
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout == "[]\n"
+
+
 def test_custom_argument_parser(capsys: pytest.CaptureFixture[Any]) -> None:
     parser = CustomArgumentParser("program")
     parser.add_argument("--version", action="version", version="%(prog)s 0.2.0")
@@ -104,6 +142,538 @@ def test_routes(capsys: pytest.CaptureFixture[Any]) -> None:
     os.remove("json/f.json")
 
 
+def test_routes_add_many() -> None:
+    routes = Routes()
+    routes.add("A", "B", 5)
+
+    added = routes.add_many(
+        [("X", "Y", 3), ("a", "b", 5), ("C", "D", 9), ("x", "y", 3)]
+    )
+    assert added == 2
+    assert routes.routes == [
+        Route("x", "y", 3),
+        Route("a", "b", 5),
+        Route("c", "d", 9),
+    ]
+
+    with pytest.raises(RouteExistsError):
+        routes.add("C", "D", 9)
+
+    routes.add("E", "F", 5)
+    assert [route.number for route in routes.routes] == [3, 5, 5, 9]
+    assert routes.routes[2] == Route("e", "f", 5)
+
+    loaded = Routes()
+    loaded.add("nevin", "armavir", 1)
+    loaded.load(Path("json/fi.json"))
+    with pytest.raises(RouteExistsError):
+        loaded.add("stav", "nevin", 15)
+
+
+def test_routes_select_index() -> None:
+    routes = Routes()
+    routes.add("A", "B", 7)
+    routes.add("B", "C", 2)
+
+    assert routes.select("b").routes == [Route("b", "c", 2), Route("a", "b", 7)]
+    assert len(routes.select("nowhere")) == 0
+
+    routes.add("C", "B", 4)
+    routes.add("D", "D", 1)
+    routes.add_many([("b", "e", 3)])
+    assert [route.number for route in routes.select("B").routes] == [2, 3, 4, 7]
+    assert routes.select("d").routes == [Route("d", "d", 1)]
+
+    routes.load(Path("json/fi.json"))
+    assert routes.select("stav").routes == [
+        Route("stav", "nevin", 15),
+        Route("atmavir", "stav", 68),
+    ]
+
+
+def test_routes_columns(capsys: pytest.CaptureFixture[Any]) -> None:
+    plain = Routes()
+    columnar = Routes(RouteColumns())
+    for routes in (plain, columnar):
+        routes.add("A", "B", 7)
+        routes.add("B", "C", 2)
+        routes.add_many([("C", "A", 5), ("a", "b", 7)])
+        routes.load(Path("json/fi.json"))
+        with pytest.raises(RouteExistsError):
+            routes.add("B", "C", 2)
+
+    assert isinstance(columnar.routes, RouteColumns)
+    assert columnar.routes == plain.routes
+    assert columnar.select("b").routes == plain.select("b").routes
+
+    print(plain)
+    expected = capsys.readouterr().out
+    print(columnar)
+    assert capsys.readouterr().out == expected
+
+
+def test_iter_json_array() -> None:
+    data = [{"a": 1, "b": "x y"}, 12345, "строка", [1, 2], None, 1.5]
+    text = json.dumps(data, ensure_ascii=False, indent=4)
+    for chunk_size in (1, 3, 7, 1024):
+        assert list(iter_json_array(io.StringIO(text), chunk_size)) == data
+
+    assert list(iter_json_array(io.StringIO(" [ ] "), 1)) == []
+
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(io.StringIO("{}"), 4))
+
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(io.StringIO("[1, 2"), 2))
+
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(io.StringIO("[1 2]"), 2))
+
+    # Данные после массива и позиции ошибок относительно начала файла,
+    # как у json.loads, при любом размере блока.
+    invalid = [
+        "[1]x",
+        "[1] [2]",
+        "[]\n\n  ,",
+        '[\n  {"a": 1},\n  {"b": 2}\n  {"c": 3}\n]',
+        '[\n  "строка",\n  {"a": tru}\n]',
+        "[1, 2",
+    ]
+    for doc in invalid:
+        with pytest.raises(json.JSONDecodeError) as expected:
+            json.loads(doc)
+        for chunk_size in (1, 2, 5, 1024):
+            with pytest.raises(json.JSONDecodeError) as excinfo:
+                list(iter_json_array(io.StringIO(doc), chunk_size))
+            assert str(excinfo.value) == str(expected.value)
+            assert excinfo.value.pos == expected.value.pos
+
+
+def test_routes_load_stream() -> None:
+    routes = Routes()
+    routes.load(Path("json/fi.json"))
+
+    streamed = Routes()
+    streamed.load(Path("json/fi.json"), chunk_size=5)
+    assert streamed.routes == routes.routes
+
+    with pytest.raises(ValidationError):
+        Routes().load(Path("json/fi_invalid.json"), chunk_size=5)
+
+
+def test_validate_routes() -> None:
+    with open("json/fi.json", encoding="utf-8") as file_in:
+        valid = json.load(file_in)
+    validate_routes(valid)
+    validate_route(valid[0])
+
+    # Запись, не прошедшая быструю проверку, но допустимая по схеме.
+    validate_route({"__type__": "Route", "start": "a", "end": "b", "number": 1.0})
+
+    with open("json/fi_invalid.json", encoding="utf-8") as file_in:
+        invalid = json.load(file_in)
+    with pytest.raises(ValidationError) as expected:
+        validate(instance=invalid, schema=ROUTES_SCHEMA)
+    with pytest.raises(ValidationError) as excinfo:
+        validate_routes(invalid)
+    assert excinfo.value.message == expected.value.message
+    assert list(excinfo.value.path) == [0, "__type__"]
+
+    items: list[Any] = [
+        {"__type__": "Route", "start": "a", "end": "b"},
+        {"__type__": "Route", "start": "a", "end": "b", "number": True},
+        {"__type__": "Route", "start": 1, "end": "b", "number": 1},
+        [],
+    ]
+    for item in items:
+        with pytest.raises(ValidationError):
+            validate_route(item)
+
+    with pytest.raises(ValidationError):
+        validate_routes({})
+
+
+def test_routes_binary(tmp_path: Path) -> None:
+    routes = Routes()
+    routes.load(Path("json/fi.json"))
+    routes.add("Ставрополь", "nevin", 20)
+
+    file_path = tmp_path / "routes.bin"
+    routes.save(file_path)
+
+    with RouteFile(file_path) as route_file:
+        assert len(route_file) == 4
+        assert list(route_file) == list(routes.routes)
+        assert route_file[-1] == Route("atmavir", "stav", 68)
+        assert route_file[1:3] == list(routes.routes)[1:3]
+        assert route_file[::2] == list(routes.routes)[::2]
+        assert route_file.select("NEVIN") == routes.select("nevin").routes
+        assert route_file.select("ставрополь") == [Route("ставрополь", "nevin", 20)]
+        assert route_file.select("nowhere") == []
+        with pytest.raises(IndexError):
+            route_file[4]
+
+    opened = Routes.open(file_path)
+    assert isinstance(opened.routes, RouteFile)
+    assert opened.select("stav").routes == routes.select("stav").routes
+    opened.add("a", "b", 1)
+    assert isinstance(opened.routes, list)
+    assert len(opened) == 5
+
+    loaded = Routes()
+    loaded.load(file_path)
+    assert loaded.routes == routes.routes
+
+    empty_path = tmp_path / "empty.bin"
+    Routes().save(empty_path)
+    assert len(Routes.open(empty_path)) == 0
+
+    with pytest.raises(ValueError):
+        RouteFile(Path("XML/file.xml"))
+
+    # Обрезанный файл и файл короче заголовка отвергаются при открытии.
+    data = file_path.read_bytes()
+    for size in (len(data) - 1, len(data) - 8, 10):
+        broken_path = tmp_path / "broken.bin"
+        broken_path.write_bytes(data[:size])
+        with pytest.raises(ValueError):
+            Routes.open(broken_path)
+
+
+def test_main_convert(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    shutil.copy("json/fi.json", tmp_path / "fi.json")
+
+    main("convert --home fi.json -o fi.bin".split())
+    main("add --home -s a -e b -n 1 fi.bin".split())
+    main("convert --home fi.bin -o back.json".split())
+
+    routes = Routes()
+    routes.load(tmp_path / "back.json")
+    assert routes.routes[0] == Route("a", "b", 1)
+    assert len(routes) == 4
+
+    with pytest.raises(FileNotExistsError):
+        main("convert --home missing.json -o missing.bin".split())
+
+    # Повторное преобразование заменяет файл вместе с его журналом.
+    main("convert --home fi.json -o fi.bin".split())
+    main("add --home -s x -e y -n 1 --journal fi.bin".split())
+    assert journal_path(tmp_path / "fi.bin").exists()
+    main("convert --home fi.json -o fi.bin".split())
+    assert not journal_path(tmp_path / "fi.bin").exists()
+    converted = Routes.open(tmp_path / "fi.bin")
+    assert list(converted.routes) == Routes.open(tmp_path / "fi.json").routes
+
+
+def test_routes_page_write(tmp_path: Path) -> None:
+    routes = Routes()
+    routes.load(Path("json/fi.json"))
+    assert routes.page() is routes
+    assert routes.page(1).routes == list(routes.routes)[1:]
+    assert routes.page(1, 1).routes == [Route("stav", "nevin", 15)]
+    assert not routes.page(5, 2)
+
+    out = io.StringIO()
+    routes.page(1, 1).write(out, first=2)
+    assert out.getvalue().splitlines()[3] == (
+        "|  2   | stav                           | nevin                "
+        "|               15 |"
+    )
+    assert "".join(line + "\n" for line in routes.iter_table()) == str(routes) + "\n"
+
+    out = io.StringIO()
+    routes.write(out, "jsonl")
+    assert [json.loads(line) for line in out.getvalue().splitlines()] == (
+        json.loads(Path("json/fi.json").read_text())
+    )
+
+    out = io.StringIO()
+    routes.page(2).write(out, "csv")
+    assert out.getvalue() == "start,end,number\natmavir,stav,68\n"
+
+    with pytest.raises(ValueError):
+        routes.write(io.StringIO(), "xml")
+
+    file_path = tmp_path / "routes.bin"
+    routes.save(file_path)
+    with RouteFile(file_path) as route_file:
+        page = Routes(route_file).page(1, 1)
+        assert page.routes == [Route("stav", "nevin", 15)]
+        # Декодированы только пункты маршрута со страницы.
+        assert sorted(route_file._strings.values()) == ["nevin", "stav"]
+
+
+def test_main_list_page(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[Any],
+) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    shutil.copy("json/fi.json", tmp_path / "fi.json")
+
+    main("list --home fi.json".split())
+    full = capsys.readouterr().out
+    main("list --home --offset 1 --limit 1 fi.json".split())
+    out = capsys.readouterr().out
+    assert out.count("\n") == 5 and full.splitlines()[4] in out
+
+    main("convert --home fi.json -o fi.bin".split())
+    main("list --home --format csv --offset 2 fi.bin".split())
+    assert capsys.readouterr().out == "start,end,number\natmavir,stav,68\n"
+
+    main("select --home -p stav --format jsonl --limit 1 fi.json".split())
+    assert json.loads(capsys.readouterr().out)["number"] == 15
+
+    with pytest.raises(argparse.ArgumentError):
+        main("list --home --limit -1 fi.json".split())
+
+
+def test_routes_open_many(tmp_path: Path) -> None:
+    first, second, third = (tmp_path / name for name in ("1.json", "2.bin", "3.json"))
+    Routes([Route("a", "b", 1), Route("b", "c", 5), Route("c", "d", 9)]).save(first)
+    Routes([Route("x", "y", 2), Route("y", "z", 5)]).save(second)
+    # Файл, не упорядоченный по номеру, и журнал третьего файла.
+    Routes([Route("p", "q", 7), Route("q", "r", 3)]).save(third)
+    Routes().append_journal(third, Route("r", "s", 4))
+
+    expected = [1, 2, 3, 4, 5, 5, 7, 9]
+    for workers in (1, 2):
+        routes = Routes.open_many([first, second, third], workers=workers)
+        assert [route.number for route in routes.routes] == expected
+        assert list(routes.routes)[4:6] == [Route("b", "c", 5), Route("y", "z", 5)]
+        with pytest.raises(RouteExistsError):
+            routes.add("A", "B", 1)
+
+    Routes([Route("c", "d", 9)]).save(tmp_path / "4.json")
+    with pytest.raises(RouteExistsError) as excinfo:
+        Routes.open_many([first, tmp_path / "4.json"], workers=2)
+    assert excinfo.value.route == Route("c", "d", 9)
+
+
+def test_main_list_files(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[Any],
+) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    Routes([Route("a", "b", 1), Route("b", "c", 3)]).save(tmp_path / "north.json")
+    Routes([Route("c", "d", 2)]).save(tmp_path / "south.json")
+    Routes().append_journal(tmp_path / "south.json", Route("d", "a", 4))
+
+    main("list --home --format csv north.json south.json".split())
+    merged = "start,end,number\na,b,1\nc,d,2\nb,c,3\nd,a,4\n"
+    assert capsys.readouterr().out == merged
+
+    main(["list", "--home", "--format", "csv", "-w", "2", "*.json"])
+    assert capsys.readouterr().out == merged
+
+    main("select --home -p c --format csv *th.json".split())
+    assert capsys.readouterr().out == "start,end,number\nc,d,2\nb,c,3\n"
+
+    with pytest.raises(FileNotExistsError):
+        main("list --home north.json west.json".split())
+    with pytest.raises(FileNotExistsError):
+        main("list --home *.bin".split())
+    for workers in ("0", "-2"):
+        with pytest.raises(argparse.ArgumentError):
+            main(["list", "--home", "-w", workers, "north.json"])
+
+
+def test_routes_journal(tmp_path: Path) -> None:
+    file_path = tmp_path / "routes.json"
+    shutil.copy("json/fi.json", file_path)
+
+    routes = Routes.open(file_path)
+    assert routes.append_journal(file_path, routes.add("A", "B", 1)) == 1
+    assert routes.append_journal(file_path, routes.add("C", "D", 99)) == 2
+
+    reopened = Routes.open(file_path)
+    assert reopened.routes == routes.routes
+
+    # Незавершенная строка после сбоя не применяется и отбрасывается
+    # при следующей записи.
+    with journal_path(file_path).open("a", encoding="utf-8") as file_out:
+        file_out.write('{"__type__": "Route", "start": "x"')
+    assert Routes.open(file_path).routes == routes.routes
+    assert routes.append_journal(file_path, routes.add("E", "F", 2)) == 3
+    assert Routes.open(file_path).routes == routes.routes
+
+    # Повторное применение журнала после переноса не создает дубликатов.
+    routes.save(file_path)
+    assert Routes.open(file_path).routes == routes.routes
+
+    routes.compact(file_path)
+    assert not journal_path(file_path).exists()
+    assert Routes.open(file_path).routes == routes.routes
+
+
+def test_main_journal(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setattr("ind_1.JOURNAL_LIMIT", 3)
+    shutil.copy("json/fi.json", tmp_path / "fi.json")
+    size = (tmp_path / "fi.json").stat().st_size
+
+    main("add --home --journal -s a -e b -n 1 fi.json".split())
+    main("add --home --journal -s a -e b -n 2 fi.json".split())
+    assert (tmp_path / "fi.json").stat().st_size == size
+    with pytest.raises(RouteExistsError):
+        main("add --home --journal -s a -e b -n 2 fi.json".split())
+
+    main("add --home --journal -s a -e b -n 3 fi.json".split())
+    assert not journal_path(tmp_path / "fi.json").exists()
+    assert len(Routes.open(tmp_path / "fi.json")) == 6
+
+    main("add --home --journal -s a -e b -n 4 new.json".split())
+    assert (tmp_path / "new.json").exists()
+    assert not journal_path(tmp_path / "new.json").exists()
+
+
+def add_routes(worker: int, count: int, options: list[str]) -> None:
+    for number in range(count):
+        main(
+            [
+                "add",
+                "--home",
+                *options,
+                "-s",
+                f"w{worker}",
+                "-e",
+                "x",
+                "-n",
+                str(number),
+            ]
+        )
+
+
+@pytest.mark.parametrize(
+    "options", [[], ["--journal"], ["--optimistic"], ["--optimistic", "--journal"]]
+)
+def test_main_concurrent_add(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, options: list[str]
+) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setattr("ind_1.JOURNAL_LIMIT", 7)
+    Routes([Route("a", "b", 1)]).save(tmp_path / "shared.json")
+    options = [*options, "shared.json"]
+
+    workers, count = 4, 15
+    context = multiprocessing.get_context("fork")
+    processes = [
+        context.Process(target=add_routes, args=(worker, count, options))
+        for worker in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert [process.exitcode for process in processes] == [0] * workers
+
+    routes = Routes.open(tmp_path / "shared.json")
+    assert len(routes) == workers * count + 1
+    assert {route.start for route in routes.routes} == {
+        "a",
+        *(f"w{worker}" for worker in range(workers)),
+    }
+
+
+def test_add_route_optimistic(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    file_path = tmp_path / "routes.json"
+    Routes([Route("a", "b", 1)]).save(file_path)
+    datasets: dict[Any, Any] = {}
+    version, routes = add_route(file_path, "B", "C", 2, datasets=datasets)
+    assert version == file_version(file_path) and len(routes) == 2
+
+    # Другой процесс изменяет файл между загрузкой и сохранением.
+    open_routes = Routes.open
+
+    def open_and_change(path: Path, chunk_size: int | None = None) -> Routes:
+        loaded = open_routes(path, chunk_size)
+        other = open_routes(path)
+        other.add("x", "y", len(other) + 10)
+        other.save(path)
+        return loaded
+
+    monkeypatch.setattr("ind_1.OPTIMISTIC_RETRIES", 3)
+    monkeypatch.setattr(Routes, "open", open_and_change)
+    with pytest.raises(ConcurrentUpdateError):
+        add_route(file_path, "c", "d", 3, optimistic=True)
+    assert len(open_routes(file_path)) == 5
+
+    calls = []
+
+    def open_and_change_once(path: Path, chunk_size: int | None = None) -> Routes:
+        calls.append(path)
+        if len(calls) == 1:
+            return open_and_change(path, chunk_size)
+        return open_routes(path, chunk_size)
+
+    monkeypatch.setattr(Routes, "open", open_and_change_once)
+    _, routes = add_route(file_path, "c", "d", 3, optimistic=True)
+    assert len(calls) == 2 and len(routes) == 7
+    assert len(open_routes(file_path)) == 7
+
+
+def test_file_version(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    file_path = tmp_path / "routes.json"
+    Routes([Route("a", "b", 1)]).save(file_path)
+    assert file_version(file_path) == (0, file_stat(file_path), None)
+
+    # Метаданные могут совпасть у разных версий файла, но счетчик
+    # сохранений в файле блокировки все равно их различает.
+    monkeypatch.setattr("ind_1.file_stat", lambda path: (1, 1, 1))
+    version = file_version(file_path)
+    add_route(file_path, "b", "c", 2, journal=True)
+    assert file_version(file_path) == (version[0] + 1, *version[1:])
+
+    open_routes = Routes.open
+
+    def open_and_change(path: Path, chunk_size: int | None = None) -> Routes:
+        loaded = open_routes(path, chunk_size)
+        with file_lock(lock_path(path)):
+            other = open_routes(path)
+            save_route(other, path, other.add("x", "y", len(other) + 10))
+        return loaded
+
+    monkeypatch.setattr("ind_1.OPTIMISTIC_RETRIES", 1)
+    monkeypatch.setattr(Routes, "open", open_and_change)
+    with pytest.raises(ConcurrentUpdateError):
+        add_route(file_path, "c", "d", 3, optimistic=True)
+
+
+def test_main_socket_client(tmp_path: Path) -> None:
+    # Клиент не настраивает журналирование и не загружает модули сервера.
+    code = (
+        "import logging, sys, ind_1\n"
+        "try:\n"
+        f"    ind_1.main(['--socket', '{tmp_path / 'routes.sock'}', 'list', 'f'])\n"
+        "except OSError:\n"
+        "    pass\n"
+        "print(logging.getLogger().handlers, 'socketserver' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd="src",
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout == "[] False\n"
+
+
+def test_report_error() -> None:
+    with pytest.raises(ValidationError) as excinfo:
+        main("list fi_invalid.json".split())
+    assert report_error(excinfo.value).startswith("Ошибка валидации: ")
+
+    error = argparse.ArgumentError(None, "bad")
+    assert report_error(error) == "Ошибка аргумента командной строки: bad"
+    assert report_error(ServerError(["list"], "message")) == "message"
+    assert report_error(FileNotExistsError(Path("f.json"))) == (
+        "f.json -> File not exists"
+    )
+
+
 def test_main() -> None:
     with pytest.raises(FileNotExistsError):
         main("list f.json".split())
@@ -113,3 +683,6 @@ def test_main() -> None:
 
     with pytest.raises(ValidationError):
         main("list fi_invalid.json".split())
+
+    with pytest.raises(ValidationError):
+        main("list --stream fi_invalid.json".split())
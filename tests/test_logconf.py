@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import logging
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from logconf import configure_logging, stop_logging
+from logqueue import BatchQueueListener
+
+FORMAT = "%(asctime)s.%(msecs)03d - %(levelname)s - %(message)s"
+LINE = re.compile(r"^\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,(\d{3})\.(\d{3}) - (\w+) - (.*)$")
+
+
+@pytest.fixture
+def logger() -> Iterator[logging.Logger]:
+    # Отдельный логгер, не зарегистрированный в logging и не связанный
+    # с обработчиками pytest.
+    logger = logging.Logger("test_logconf")
+    yield logger
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def test_configure_logging_sync(logger: logging.Logger, tmp_path: Path) -> None:
+    filename = str(tmp_path / "app.log")
+    assert configure_logging(filename, FORMAT, logger=logger) is None
+    logger.info("синхронно")
+    logger.debug("не записывается")
+    for handler in logger.handlers:
+        handler.close()
+
+    lines = Path(filename).read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1
+    match = LINE.match(lines[0])
+    assert match is not None
+    assert match.group(1) == match.group(2)
+    assert match.group(4) == "синхронно"
+
+
+def test_configure_logging_queue(logger: logging.Logger, tmp_path: Path) -> None:
+    filename = str(tmp_path / "app.log")
+    listener = configure_logging(filename, FORMAT, use_queue=True, logger=logger)
+    assert isinstance(listener, BatchQueueListener)
+    assert configure_logging(filename, FORMAT, use_queue=True, logger=logger) is None
+
+    for idx in range(100):
+        logger.info(f"запись {idx}")
+
+    # Запись об ошибке сразу сбрасывается на диск.
+    logger.error("ошибка")
+    for _ in range(100):
+        if "ошибка" in Path(filename).read_text(encoding="utf-8"):
+            break
+        time.sleep(0.01)
+    else:
+        pytest.fail("Запись об ошибке не сброшена на диск")
+
+    assert listener.running
+    stop_logging(listener)
+    assert not listener.running
+    stop_logging(listener)
+
+    lines = Path(filename).read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 101
+    for idx, line in enumerate(lines[:100]):
+        match = LINE.match(line)
+        assert match is not None
+        assert match.group(1) == match.group(2)
+        assert match.group(3) == "INFO"
+        assert match.group(4) == f"запись {idx}"
+    assert lines[100].endswith(" - ERROR - ошибка")
+
+
+def test_lazy_imports() -> None:
+    code = "import sys, logconf; print('logging.handlers' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd="src",
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout == "False\n"
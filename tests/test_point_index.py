@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import random
+import shutil
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from ind_1 import Route, Routes, main
+from point_index import PointIndex
+
+
+def levenshtein(first: str, second: str) -> int:
+    row = list(range(len(second) + 1))
+    for idx, char in enumerate(first, 1):
+        above, row = row, [idx]
+        for col, other in enumerate(second, 1):
+            row.append(
+                min(row[col - 1] + 1, above[col] + 1, above[col - 1] + (char != other))
+            )
+    return row[-1]
+
+
+def test_point_index() -> None:
+    index = PointIndex(["москва", "моск", "мост", "минск", "омск", "томск", "моск"])
+    assert len(index) == 6
+    assert "мост" in index and "мос" not in index
+
+    assert index.prefix("Мос") == ["моск", "москва", "мост"]
+    assert index.prefix("") == index.points
+    assert index.prefix("я") == []
+
+    assert index.fuzzy("ОМСК", 0) == ["омск"]
+    assert index.fuzzy("омск") == ["омск", "томск"]
+    assert index.fuzzy("омск", 2) == ["моск", "омск", "томск"]
+    assert index.fuzzy("моска") == ["моск", "москва"]
+    assert index.fuzzy("мокса") == []
+
+    index.add("мокша")
+    index.add("омск")
+    assert len(index) == 7
+    assert index.fuzzy("мокса") == ["мокша"]
+
+
+def test_point_index_fuzzy_exhaustive() -> None:
+    rng = random.Random(1)
+    points = {
+        "".join(rng.choice("абвг") for _ in range(rng.randint(1, 6)))
+        for _ in range(500)
+    }
+    index = PointIndex(points)
+    for query in ["", "а", "абвгд", *sorted(points)[::25]]:
+        for distance in range(4):
+            expected = sorted(
+                point for point in points if levenshtein(query, point) <= distance
+            )
+            assert index.fuzzy(query, distance) == expected
+
+
+def test_routes_select_prefix_fuzzy(tmp_path: Path) -> None:
+    routes = Routes()
+    routes.load(Path("json/fi.json"))
+    assert routes.select_prefix("NE").routes == [
+        Route("nevin", "armavir", 9),
+        Route("stav", "nevin", 15),
+    ]
+    assert routes.select_fuzzy("armavir").routes == [
+        Route("nevin", "armavir", 9),
+        Route("atmavir", "stav", 68),
+    ]
+    assert not routes.select_fuzzy("stavropol")
+
+    index = routes.point_index()
+    routes.add("nevinnomyssk", "kislovodsk", 3)
+    routes.add_many([("kislovodsk", "pyatigorsk", 4)])
+    assert routes.point_index() is index
+    assert routes.select_prefix("nevin").routes[0] == Route(
+        "nevinnomyssk", "kislovodsk", 3
+    )
+    assert len(routes.select_fuzzy("pjatigorsk")) == 1
+
+    file_path = tmp_path / "routes.bin"
+    routes.save(file_path)
+    opened = Routes.open(file_path)
+    assert opened.select_prefix("nevin").routes == routes.select_prefix("nevin").routes
+    assert (
+        opened.select_fuzzy("stav", 2).routes == routes.select_fuzzy("stav", 2).routes
+    )
+
+
+def test_main_select_prefix_fuzzy(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[Any],
+) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    shutil.copy("json/fi.json", tmp_path / "fi.json")
+
+    main("select --home --prefix ST fi.json".split())
+    out = capsys.readouterr().out
+    assert "| stav " in out and "|  2   |" in out and "|  3   |" not in out
+
+    main("select --home --fuzzy nevim fi.json".split())
+    assert "| nevin " in capsys.readouterr().out
+
+    main("select --home --fuzzy nyvim -d 2 fi.json".split())
+    assert "| nevin " in capsys.readouterr().out
+
+    main("select --home --fuzzy nyvim fi.json".split())
+    assert capsys.readouterr().out == "Список маршрутов пуст.\n"
+
+    with pytest.raises(argparse.ArgumentError):
+        main("select --home -p stav --prefix st fi.json".split())
+
+    with pytest.raises(argparse.ArgumentError):
+        main("select --home --fuzzy nyvim -d -1 fi.json".split())
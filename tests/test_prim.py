@@ -1,12 +1,23 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import io
 import os
+import xml.etree.ElementTree as ET
+from pathlib import Path
 from typing import Any
 
 import pytest
 
-from prim import IllegalYearError, Staff, Worker
+from prim import (
+    IllegalYearError,
+    Staff,
+    Worker,
+    WorkerColumns,
+    iter_workers,
+    main,
+    run_batch,
+)
 
 
 def test_worker() -> None:
@@ -90,3 +101,217 @@ def test_illegal_year(capsys: pytest.CaptureFixture[Any]) -> None:
     error = IllegalYearError(2029)
 
     assert str(error) == "2029 -> Illegal year number"
+
+
+def test_staff_columns(capsys: pytest.CaptureFixture[Any]) -> None:
+    plain = Staff()
+    columnar = Staff(WorkerColumns())
+    for staff in (plain, columnar):
+        staff.add("Петр", "студент", 2020)
+        staff.add("Иван", "студент", 2010)
+
+    assert isinstance(columnar.workers, WorkerColumns)
+    assert columnar.workers == plain.workers
+    assert columnar.select(10) == plain.select(10)
+
+    print(plain)
+    expected = capsys.readouterr().out
+    print(columnar)
+    assert capsys.readouterr().out == expected
+
+    columnar.load("XML/file.xml")
+    assert isinstance(columnar.workers, WorkerColumns)
+    assert len(columnar.workers) == 2
+
+
+def test_staff_add_many() -> None:
+    items = [("Петр", "студент", 2020), ("Анна", "инженер", 2015)]
+    items += [("Иван", "студент", 2010), ("Анна", "студент", 2018)]
+    one_by_one = Staff()
+    for name, post, year in items:
+        one_by_one.add(name, post, year)
+
+    for staff in (Staff(), Staff(WorkerColumns())):
+        assert staff.add_many(items[:2]) == 2
+        assert staff.add_many(iter(items[2:])) == 2
+        assert staff.workers == one_by_one.workers
+        assert [worker.name for worker in staff.workers] == [
+            "Анна",
+            "Анна",
+            "Иван",
+            "Петр",
+        ]
+        # Работники с одинаковым именем остаются в порядке добавления.
+        assert staff.workers[0].post == "инженер"
+
+        with pytest.raises(IllegalYearError):
+            staff.add_many([("Олег", "студент", 2000), ("Олег", "студент", -1)])
+        assert len(staff.workers) == 4
+
+    unsorted = Staff([Worker("Петр", "студент", 2020), Worker("Иван", "студент", 2010)])
+    unsorted.add("Анна", "студент", 2015)
+    assert [worker.name for worker in unsorted.workers] == ["Анна", "Иван", "Петр"]
+
+
+def test_staff_select_range() -> None:
+    staff = Staff()
+    staff.add_many(
+        [
+            ("Петр", "студент", 2020),
+            ("Анна", "инженер", 2015),
+            ("Иван", "студент", 2010),
+            ("Олег", "инженер", 2010),
+        ]
+    )
+
+    def names(workers: list[Worker]) -> list[str]:
+        return [worker.name for worker in workers]
+
+    assert names(staff.select_range(2010, 2015)) == ["Анна", "Иван", "Олег"]
+    assert names(staff.select_range(first=2015)) == ["Анна", "Петр"]
+    assert names(staff.select_range(last=2009)) == []
+    assert names(staff.select_range(post="инженер")) == ["Анна", "Олег"]
+    assert names(staff.select_range(2011, None, "инженер")) == ["Анна"]
+    assert names(staff.select_range(post="директор")) == []
+
+    # Индекс обновляется при добавлении и загрузке.
+    staff.add("Борис", "инженер", 2012)
+    assert names(staff.select_range(2011, 2013, "инженер")) == ["Борис"]
+    assert names(staff.select_range(2011, 2013)) == ["Борис"]
+    staff.add_many([("Вера", "студент", 2012)])
+    assert names(staff.select_range(2012, 2012)) == ["Борис", "Вера"]
+    staff.load("XML/file.xml")
+    assert names(staff.select_range(2019, 2019)) == ["Петров П.П."]
+
+
+def test_staff_load_stream(tmp_path: Path) -> None:
+    file_path = tmp_path / "workers.xml"
+    file_path.write_text(
+        "<?xml version='1.0' encoding='utf8'?>\n<workers>"
+        "<worker><name>Иванов И.И.</name><post>инженер</post><year>2001</year>"
+        "<note>лишний элемент</note><note>еще один</note></worker>"
+        "<worker><name>Без года</name><post>студент</post></worker>"
+        "<worker><name/><post>студент</post><year>2000</year></worker>"
+        "<worker><name>Сидоров <i>С.С.</i> хвост</name><post>студент</post>"
+        "<year></year></worker>"
+        "<worker><name>Петров П.П.</name><post>Студент &amp; аспирант</post>"
+        "<year>2019</year></worker></workers>",
+        encoding="utf8",
+    )
+
+    # Блоки по 7 символов разрезают элементы и многобайтные символы.
+    assert list(iter_workers(str(file_path), chunk_size=7)) == [
+        Worker("Иванов И.И.", "инженер", 2001),
+        Worker("Сидоров ", "студент", 0),
+        Worker("Петров П.П.", "Студент & аспирант", 2019),
+    ]
+
+    staff = Staff()
+    staff.load(str(file_path))
+    assert len(staff.workers) == 3
+
+    file_path.write_text("<workers><worker><name>", encoding="utf8")
+    with pytest.raises(ET.ParseError):
+        staff.load(str(file_path))
+    assert len(staff.workers) == 3
+
+
+def test_staff_save_stream(tmp_path: Path) -> None:
+    def write_tree(staff: Staff, file_path: Path) -> None:
+        root = ET.Element("workers")
+        for worker in staff.workers:
+            worker_element = ET.SubElement(root, "worker")
+            ET.SubElement(worker_element, "name").text = worker.name
+            ET.SubElement(worker_element, "post").text = worker.post
+            ET.SubElement(worker_element, "year").text = str(worker.year)
+        with file_path.open("wb") as fout:
+            ET.ElementTree(root).write(fout, encoding="utf8", xml_declaration=True)
+
+    staff = Staff()
+    expected, actual = tmp_path / "expected.xml", tmp_path / "actual.xml"
+    write_tree(staff, expected)
+    staff.save(str(actual))
+    assert actual.read_bytes() == expected.read_bytes()
+
+    staff.add_many(
+        [
+            ("Иванов <И.И.> & сын", 'инженер "первой" категории', 2001),
+            ("Петров П.П.", "студент\t >", 2019),
+        ]
+    )
+    write_tree(staff, expected)
+    staff.save(str(actual), chunk_size=10)
+    assert actual.read_bytes() == expected.read_bytes()
+    assert sorted(os.listdir(tmp_path)) == ["actual.xml", "expected.xml"]
+
+    loaded = Staff()
+    loaded.load(str(actual))
+    assert loaded.workers == staff.workers
+
+    # Пустые поля записываются закрытыми тегами, как в ElementTree.
+    staff.add("", "", 2010)
+    write_tree(staff, expected)
+    staff.save(str(actual))
+    assert actual.read_bytes() == expected.read_bytes()
+    assert b"<name /><post />" in actual.read_bytes()
+
+
+def test_run_batch(capsys: pytest.CaptureFixture[Any]) -> None:
+    script = io.StringIO(
+        "add\nПетров П.П.\nстудент\n2019\n"
+        "\n"
+        "add\nИванов И.И.\nинженер\n2001\n"
+        "add\nСидоров С.С.\nстудент\n3000\n"
+        "select 10\n"
+        "add\nАнна\nинженер\nне год\n"
+        "list\n"
+        "remove\n"
+        "add\nБорис\nинженер\n"
+    )
+    staff = Staff()
+    assert run_batch(staff, script) == 4
+    assert [worker.name for worker in staff.workers] == ["Иванов И.И.", "Петров П.П."]
+
+    captured = capsys.readouterr()
+    assert captured.out.startswith("   1: Иванов И.И.\n+------+")
+    assert captured.err.splitlines() == [
+        "Строка 13: 3000 -> Illegal year number",
+        "Строка 18: invalid literal for int() with base 10: 'не год'",
+        "Строка 20: remove -> Unknown command",
+        "Строка 23: Неожиданный конец ввода",
+    ]
+
+    assert run_batch(staff, ["add", "Вера", "студент", "2020", "exit", "list"]) == 0
+    assert len(staff.workers) == 3
+    assert capsys.readouterr().out == ""
+
+    # Верные записи пакета добавляются одним вызовом add_many.
+    batches = []
+    add_many = staff.add_many
+
+    def spy(items: Any) -> int:
+        batches.append(list(items))
+        return add_many(batches[-1])
+
+    staff.add_many = spy  # type: ignore[method-assign]
+    script = io.StringIO("add\nА\nх\n2001\nadd\nБ\nх\n-1\nadd\nВ\nх\n2002\n")
+    assert run_batch(staff, script) == 1
+    assert batches == [[("А", "х", 2001), ("В", "х", 2002)]]
+    assert capsys.readouterr().err == "Строка 8: -1 -> Illegal year number\n"
+
+
+def test_main_batch(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[Any],
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    script = tmp_path / "script.txt"
+    script.write_text("add\nИван\nстудент\n2010\nselect 5\n", encoding="utf8")
+    main(["--batch", str(script)])
+    assert capsys.readouterr().out == "   1: Иван\n"
+
+    monkeypatch.setattr("sys.stdin", io.StringIO("help\nunknown\n"))
+    with pytest.raises(SystemExit):
+        main(["--batch", "-"])
+    assert "Список команд" in capsys.readouterr().out
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import shutil
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from ind_1 import Route, Routes, main
+from route_graph import RouteGraph, count_transfers
+
+
+def test_route_graph() -> None:
+    graph = RouteGraph(
+        [
+            Route("a", "b", 1),
+            Route("b", "c", 1),
+            Route("c", "d", 1),
+            Route("a", "x", 2),
+            Route("x", "d", 3),
+            Route("d", "e", 4),
+        ]
+    )
+    assert len(graph) == 6
+
+    # Прямой путь короче, но требует пересадки; по маршруту 1 ее нет.
+    legs = graph.path("A", "d")
+    assert legs == [Route("a", "b", 1), Route("b", "c", 1), Route("c", "d", 1)]
+    assert legs is not None and count_transfers(legs) == 0
+
+    legs = graph.path("a", "e")
+    assert legs is not None and count_transfers(legs) == 1
+    assert legs[-1] == Route("d", "e", 4)
+
+    assert graph.path("a", "a") == []
+    assert graph.path("e", "a") is None
+    assert graph.reachable("a") == {"b", "c", "d", "e", "x"}
+    assert graph.reachable("e") == set()
+
+    graph.add(Route("e", "a", 5))
+    assert graph.path("e", "b") == [Route("e", "a", 5), Route("a", "b", 1)]
+    assert "e" in graph.reachable("e")
+
+
+def test_routes_graph_updates() -> None:
+    routes = Routes()
+    routes.add("A", "B", 1)
+    graph = routes.graph()
+    assert graph.path("a", "c") is None
+
+    routes.add("B", "C", 2)
+    routes.add_many([("C", "D", 2), ("A", "B", 1)])
+    assert routes.graph() is graph
+    assert len(graph) == 3
+    legs = graph.path("a", "d")
+    assert legs is not None and [route.number for route in legs] == [1, 2, 2]
+
+
+def test_main_path(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[Any],
+) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    shutil.copy("json/fi.json", tmp_path / "fi.json")
+
+    main("path --home -s Stav -e armavir fi.json".split())
+    out = capsys.readouterr().out
+    assert "| stav " in out and "| nevin " in out
+    assert out.endswith("Пересадок: 1\n")
+
+    main("path --home -s armavir -e stav fi.json".split())
+    assert "не найден" in capsys.readouterr().out
+
+    datasets: dict[Any, Any] = {}
+    main("path --home -s stav -e armavir fi.json".split(), datasets)
+    (_, routes), *_ = datasets.values()
+    graph = routes.graph()
+    main("add --home -s armavir -e atmavir -n 70 fi.json".split(), datasets)
+    main("path --home -s armavir -e stav fi.json".split(), datasets)
+    assert "Пересадок: 1" in capsys.readouterr().out
+    assert datasets[tmp_path / "fi.json"][1].graph() is graph
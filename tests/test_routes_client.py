@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import subprocess
+import sys
+from pathlib import Path
+
+from routes_client import socket_command
+
+
+def test_socket_command() -> None:
+    assert socket_command("--socket s list fi.json".split()) == (
+        "s",
+        ["list", "fi.json"],
+    )
+    assert socket_command("--async-log --socket=s add -n 1 fi.json".split()) == (
+        "s",
+        ["--async-log", "add", "-n", "1", "fi.json"],
+    )
+    assert socket_command("list fi.json".split()) == (None, ["list", "fi.json"])
+    # Команда serve и параметры без команды разбираются самой программой.
+    assert socket_command("--socket s serve".split()) == (None, ["serve"])
+    assert socket_command("--socket s --version".split()) == (None, ["--version"])
+
+
+def test_client_imports(tmp_path: Path) -> None:
+    # Команда для сервера отправляется без загрузки программы маршрутов.
+    code = (
+        "import sys, routes_client\n"
+        "try:\n"
+        "    routes_client.main(\n"
+        f"        ['--socket', '{tmp_path / 'routes.sock'}', 'list', 'f']\n"
+        "    )\n"
+        "except OSError:\n"
+        "    pass\n"
+        "print(sorted({'ind_1', 'logging', 'argparse'} & set(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd="src",
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout == "[]\n"
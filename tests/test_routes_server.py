@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import shutil
+import threading
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from ind_1 import Routes, ServerError, main, report_error
+from routes_client import main as client_main
+from routes_server import CommandServer
+
+
+def test_server(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[Any],
+) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    shutil.copy("json/fi.json", tmp_path / "fi.json")
+    socket_path = tmp_path / "routes.sock"
+    server = CommandServer(socket_path, main, report_error)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        main(f"--socket {socket_path} add --home -s a -e b -n 1 fi.json".split())
+        assert len(server.datasets) == 1
+        _, cached = server.datasets[tmp_path / "fi.json"]
+
+        main(f"--socket={socket_path} select --home -p A fi.json".split())
+        assert "| a " in capsys.readouterr().out
+        assert server.datasets[tmp_path / "fi.json"][1] is cached
+
+        with pytest.raises(ServerError) as excinfo:
+            main(f"--socket {socket_path} add --home -s a -e b -n 1 fi.json".split())
+        assert str(excinfo.value).endswith("Route already exists")
+        assert len(Routes.open(tmp_path / "fi.json")) == 4
+
+        # Файл, измененный в обход сервера, загружается повторно.
+        Routes().save(tmp_path / "fi.json")
+        main(f"--socket {socket_path} list --home fi.json".split())
+        assert capsys.readouterr().out == "Список маршрутов пуст.\n"
+
+        with pytest.raises(SystemExit):
+            main(f"--socket {socket_path} --version".split())
+        capsys.readouterr()
+
+        # Клиент принимает те же аргументы, что и программа маршрутов.
+        client = ["--socket", str(socket_path), "list", "--home"]
+        assert client_main([*client, "fi.json"]) == 0
+        assert capsys.readouterr().out == "Список маршрутов пуст.\n"
+        assert client_main([*client, "no.json"]) == 1
+        assert "no.json" in capsys.readouterr().err
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # Без параметра --socket команда выполняется самой программой.
+    assert client_main(["list", "--home", "fi.json"]) == 0
+    assert capsys.readouterr().out == "Список маршрутов пуст.\n"
+    assert client_main(["list", "--home", "no.json"]) == 1
+    assert "no.json" in capsys.readouterr().err
+
+    with pytest.raises(argparse.ArgumentError):
+        main(["serve"])
@@ -1,11 +1,22 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import io
+from pathlib import Path
 from typing import Any
 
 import pytest
 
-from task_2 import Matrix, NumberNotPositiveError, StartGreaterThanEndError, main
+from task_2 import (
+    Matrix,
+    MatrixFile,
+    NumberNotPositiveError,
+    StartGreaterThanEndError,
+    UnknownEngineError,
+    format_row,
+    main,
+    select_dtype,
+)
 
 
 def test_matrix(capsys: pytest.CaptureFixture[Any]) -> None:
@@ -44,6 +55,233 @@ def test_matrix(capsys: pytest.CaptureFixture[Any]) -> None:
         fatall_matrix.generate_matrix()
 
 
+def test_matrix_seed() -> None:
+    matrix = Matrix(3, 4, -5, 5, seed=42)
+    matrix.generate_matrix()
+    same = Matrix(3, 4, -5, 5, seed=42)
+    same.generate_matrix()
+    assert matrix.matrix == same.matrix
+
+    with pytest.raises(UnknownEngineError):
+        Matrix(3, 4, 1, 5, engine="fortran")
+
+
+def test_select_dtype() -> None:
+    assert select_dtype(0, 255) == "uint8"
+    assert select_dtype(0, 256) == "uint16"
+    assert select_dtype(-1, 127) == "int8"
+    assert select_dtype(-129, 0) == "int16"
+    assert select_dtype(-1, 2**40) == "int64"
+    with pytest.raises(OverflowError):
+        select_dtype(-1, 2**63)
+
+
+def test_matrix_numpy(capsys: pytest.CaptureFixture[Any]) -> None:
+    np = pytest.importorskip("numpy")
+
+    matrix = Matrix(20, 30, -3, 3, engine="numpy", seed=7)
+    matrix.generate_matrix()
+    assert matrix.array is not None
+    assert matrix.array.shape == (20, 30)
+    assert matrix.array.dtype == np.int8
+    assert matrix.array.min() >= -3 and matrix.array.max() <= 3
+
+    assert len(matrix.matrix) == 20
+    assert all(len(row) == 30 for row in matrix.matrix)
+    assert all(type(elem) is int for elem in matrix.matrix[0])
+
+    same = Matrix(20, 30, -3, 3, engine="numpy", seed=7)
+    same.generate_matrix()
+    assert same.matrix == matrix.matrix
+    assert matrix.array is None
+    print(matrix)
+    printed = capsys.readouterr().out
+    print(same)
+    assert capsys.readouterr().out == printed
+
+    with pytest.raises(NumberNotPositiveError):
+        Matrix(0, 3, 1, 5, engine="numpy").generate_matrix()
+
+    with pytest.raises(StartGreaterThanEndError):
+        Matrix(2, 3, 10, 5, engine="numpy").generate_matrix()
+
+
+def test_matrix_edit(tmp_path: Path) -> None:
+    pytest.importorskip("numpy")
+
+    # Изменения через список списков видны при выводе и сохранении,
+    # даже если матрица сгенерирована numpy или открыта из файла.
+    matrix = Matrix(2, 2, 1, 9, engine="numpy", seed=1)
+    matrix.generate_matrix()
+    matrix.matrix[0][0] = 100
+    assert str(matrix).startswith("|\t100\t")
+    matrix.save(tmp_path / "matrix.csv")
+    assert Matrix.load(tmp_path / "matrix.csv").matrix[0][0] == 100
+
+    matrix.generate_matrix(file_path=tmp_path / "matrix.mtx")
+    with Matrix.open(tmp_path / "matrix.mtx") as opened:
+        opened.matrix[1][1] = 7
+        assert opened.file is None
+        assert list(opened.iter_rows())[1][1] == 7
+
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_matrix_stream(engine: str) -> None:
+    if engine == "numpy":
+        pytest.importorskip("numpy")
+
+    matrix = Matrix(2500, 3, -10, 10, engine=engine, seed=5)
+    out = io.StringIO()
+    matrix.write(out, chunk_rows=100)
+    assert not matrix.is_generated()
+    assert str(matrix) == "Матрица пока не сгенерирована"
+
+    matrix.generate_matrix()
+    assert out.getvalue() == str(matrix)
+    assert list(matrix.iter_rows()) == matrix.matrix
+    assert str(matrix).splitlines()[0] == format_row(matrix.matrix[0]).rstrip("\n")
+
+    with pytest.raises(StartGreaterThanEndError):
+        Matrix(2, 3, 10, 5, engine=engine).write(out)
+
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_matrix_parallel(engine: str) -> None:
+    if engine == "numpy":
+        pytest.importorskip("numpy")
+
+    matrix = Matrix(2500, 4, -100, 100, engine=engine, seed=11)
+    matrix.generate_matrix()
+    parallel = Matrix(2500, 4, -100, 100, engine=engine, seed=11)
+    parallel.generate_matrix(workers=3)
+    assert parallel.matrix == matrix.matrix
+    assert len(parallel.matrix) == 2500
+
+    # Без зерна матрицу можно воспроизвести по сохраненному зерну.
+    unseeded = Matrix(2500, 4, -100, 100, engine=engine)
+    unseeded.generate_matrix(workers=2)
+    again = Matrix(2500, 4, -100, 100, engine=engine, seed=unseeded.generated_seed)
+    again.generate_matrix()
+    assert again.matrix == unseeded.matrix
+
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_matrix_file(engine: str, tmp_path: Path) -> None:
+    if engine == "numpy":
+        pytest.importorskip("numpy")
+
+    file_path = tmp_path / "matrix.mtx"
+    expected = Matrix(2500, 5, -1000, 1000, engine=engine, seed=3)
+    expected.generate_matrix()
+
+    matrix = Matrix(2500, 5, -1000, 1000, engine=engine, seed=3)
+    matrix.generate_matrix(workers=2, file_path=file_path)
+    assert matrix.file is not None
+    assert matrix.file.typecode == "h"
+    assert list(matrix.iter_rows()) == expected.matrix
+    matrix.close()
+
+    with Matrix.open(file_path) as reopened:
+        assert (reopened.rows, reopened.columns) == (2500, 5)
+        assert (reopened.start, reopened.end) == (-1000, 1000)
+        assert (reopened.engine, reopened.seed) == (engine, 3)
+        assert str(reopened) == str(expected)
+
+    with MatrixFile(file_path) as file:
+        assert len(file) == 2500
+        assert file[0] == expected.matrix[0]
+        assert file[-1] == expected.matrix[-1]
+        assert file[1020:1030] == expected.matrix[1020:1030]
+        assert file[::500] == expected.matrix[::500]
+        with pytest.raises(IndexError):
+            file[2500]
+
+    data = file_path.read_bytes()
+    file_path.write_bytes(data[:-1])
+    with pytest.raises(ValueError):
+        MatrixFile(file_path)
+    file_path.write_bytes(b"not a matrix")
+    with pytest.raises(ValueError):
+        MatrixFile(file_path)
+
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_matrix_save_load(engine: str, tmp_path: Path) -> None:
+    if engine == "numpy":
+        pytest.importorskip("numpy")
+
+    matrix = Matrix(1500, 4, -5, 300, engine=engine, seed=9)
+    matrix.generate_matrix()
+    for name in ["matrix.mtx", "matrix.csv"]:
+        matrix.save(tmp_path / name)
+        with Matrix.load(tmp_path / name) as loaded:
+            assert loaded.matrix == matrix.matrix
+            assert (loaded.rows, loaded.columns) == (1500, 4)
+
+    lines = (tmp_path / "matrix.csv").read_text(encoding="utf-8").splitlines()
+    assert lines[0] == ",".join(map(str, matrix.matrix[0]))
+
+    # Несгенерированная матрица генерируется при сохранении.
+    Matrix(1500, 4, -5, 300, engine=engine, seed=9).save(tmp_path / "new.mtx")
+    with Matrix.load(tmp_path / "new.mtx") as loaded:
+        assert loaded.seed == 9
+        assert list(loaded.iter_rows()) == matrix.matrix
+
+    (tmp_path / "bad.csv").write_text("1,2\n3\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        Matrix.load(tmp_path / "bad.csv")
+
+
+def test_matrix_save_out_of_range(tmp_path: Path) -> None:
+    # Тип значений в файле выбирается по фактическим значениям матрицы,
+    # заданной вручную, а не только по диапазону генерации.
+    for rows, header_range in [
+        ([[1, 2], [300, 4]], (1, 300)),
+        ([[-1, 2], [3, 4]], (-1, 9)),
+    ]:
+        matrix = Matrix(2, 2, 1, 9)
+        matrix.matrix = rows
+        matrix.save(tmp_path / "matrix.mtx")
+        with Matrix.load(tmp_path / "matrix.mtx") as loaded:
+            assert (loaded.start, loaded.end) == header_range
+            assert loaded.matrix == rows
+
+    matrix = Matrix(1, 1, 0, 1)
+    matrix.matrix = [[2**64]]
+    with pytest.raises(OverflowError):
+        matrix.save(tmp_path / "big.mtx")
+
+
+def test_matrix_file_array(tmp_path: Path) -> None:
+    np = pytest.importorskip("numpy")
+
+    matrix = Matrix(30, 20, 0, 70000, engine="numpy", seed=1)
+    matrix.generate_matrix(file_path=tmp_path / "matrix.mtx")
+    assert matrix.file is not None
+    values = matrix.file.as_array()
+    assert values.dtype == np.uint32
+    assert not values.flags.owndata
+    rows = matrix.matrix
+    assert values.tolist() == rows
+    del values
+    matrix.close()
+    assert matrix.file is None
+
+    # Файл закрывается и при живом массиве: отображение освобождается
+    # вместе с последним массивом.
+    with MatrixFile(tmp_path / "matrix.mtx") as matrix_file:
+        values = matrix_file.as_array()
+    assert values.tolist() == rows
+    del values
+
+    matrix = Matrix.open(tmp_path / "matrix.mtx")
+    assert matrix.file is not None
+    values = matrix.file.as_array()
+    matrix.close()
+    assert matrix.file is None
+    assert values.tolist() == rows
+
+
 def test_start_greater_than_end(capsys: pytest.CaptureFixture[Any]) -> None:
     error = StartGreaterThanEndError(10, 5)
 